@@ -11,6 +11,11 @@
 #include <sys/mman.h>
 #include <fcntl.h>
 #endif
+#if defined(USE_SHARED_MEMORY) || defined(USE_MEMORY_MAPPED_FILE)
+#include <limits.h>
+#include <linux/futex.h>
+#include <sys/syscall.h>
+#endif
 
 #include "core/driver/eMPL/inv_mpu.h"
 #include "core/driver/eMPL/inv_mpu_dmp_motion_driver.h"
@@ -599,9 +604,11 @@ int main(int argc, char**argv)
 				mmap_memory->shared_readings_buffer[new_sample].quaternion[3] = qz;
 				mmap_memory->shared_readings_buffer[new_sample].flags = 0;
 				// Update the buffer info
-				mmap_memory->sample_number = sample_count;
 				mmap_memory->latest_sample = new_sample;
 				mmap_memory->oldest_sample = oldest_sample;
+				// Finally bump the sample number and wake any readers waiting on it
+				mmap_memory->sample_number = sample_count;
+				syscall(SYS_futex, &mmap_memory->sample_number, FUTEX_WAKE, INT_MAX, NULL, NULL, 0);
 
 				if(debug)
 					fprintf(stderr, "#%lu: Time %lu: buffer: %d -> %d\n", sample_count, sensor_timestamp, oldest_sample, new_sample );
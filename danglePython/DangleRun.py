@@ -18,8 +18,10 @@ from challenge.challengeManualSequence import ChallengeManualSequence
 # Factories
 from interfaces.SensorAccessFactory import SensorAccessFactory
 from interfaces.ControlAccessFactory import ControlAccessFactory
+from analysis.FixedRateScheduler import FixedRateScheduler
+from analysis.TaskScheduler import TaskScheduler
 
-MEDIUM_PRIORITY_FREQ = 10	# as proprotion of high priority
+MEDIUM_PRIORITY_FREQ = 10	# as proprotion of high priority, for processes added without their own rate
 
 # recommended for auto-disabling motors on shutdown!
 def stopAtExit():
@@ -33,20 +35,23 @@ class DangleRun:
 		ap = argparse.ArgumentParser()
 		ap.add_argument("-c", "--challenge", type=str, default="ChallengeWallFollowControl",
 			help="clas name of the challenge processor")
+		ap.add_argument("-r", "--rate", type=float, default=100.0,
+			help="main loop rate (Hz)")
+		ap.add_argument("-s", "--spin", type=float, default=0.0,
+			help="microseconds at the end of each tick to busy-wait rather than sleep, for less jitter")
 		self.args = vars(ap.parse_args())
 		# Factories
 		self.controls = ControlAccessFactory.getSingleton()
 		self.sensors = SensorAccessFactory.getSingleton()
-		# Processing lists
-		self.highPriorityProcesses = []
-		self.medPriorityProcesses = []
-		self.counter = 0
+		# Processing lists, each process can also be appended with its own rate (Hz) and phase
+		self.tasks = TaskScheduler(self.args["rate"])
+		self.highPriorityProcesses = self.tasks.list()
+		self.medPriorityProcesses = self.tasks.list(self.args["rate"] / MEDIUM_PRIORITY_FREQ)
+		self.scheduler = FixedRateScheduler(self.args["rate"], self.args["spin"] * 1e-6)
+		atexit.register(self.scheduler.printStats)
 		# Run the challenge instance
 		self.challenge = globals()[self.args["challenge"]]()
 		
-	def processAll(self, processes):
-		[x.process() for x in processes]
-	
 	def run(self):
 		# Get initial state
 		self.sensors.process()
@@ -54,15 +59,14 @@ class DangleRun:
 		# Set initial state of servos and motors
 		self.controls.stopAllMotors()
 	
-		# Common controls
-		self.highPriorityProcesses.append(self.controls)
-
 		# Add challenge-specific controls
 		self.challenge.createProcesses(self.highPriorityProcesses, self.medPriorityProcesses)
 
+		# Common controls, last so they publish the values set this tick
+		self.highPriorityProcesses.append(self.controls)
+
 		# Set initial state of servos and motors
-		self.processAll(self.highPriorityProcesses)
-		self.processAll(self.medPriorityProcesses)
+		self.tasks.processAll()
 		
 		# Loop until the user clicks the close button.
 		done = False
@@ -71,20 +75,16 @@ class DangleRun:
 		self.challenge.start()
 		
 		while not done:
-			self.counter += 1
-			
 			# Get current sensor state
 			self.sensors.process()
 			
 			# Calculate next move
 			self.challenge.move()
 			
-			# Update everything
-			self.processAll(self.highPriorityProcesses)
-			if self.counter % MEDIUM_PRIORITY_FREQ == 0:
-				self.processAll(self.medPriorityProcesses)
+			# Update everything due this tick
+			self.tasks.process()
 			
-			time.sleep(0.01) # secs
+			self.scheduler.wait()
 
 			# Keep challenge alive if sensors also alive
 			if self.sensors.checkWatchdog() > 0:
@@ -93,6 +93,8 @@ class DangleRun:
 				print("Sensor watchdog expired... stopping")
 				self.challenge.stop()
 				time.sleep(1.0)
+				self.scheduler.printStats()
+				self.scheduler.reset()
 			
 main = DangleRun()
 main.run()
@@ -66,6 +66,7 @@ def GetSelection(selected):
 	upDownButtons = StepUpDownButtonValue(sensors.button(14), sensors.button(13), min = 0, max = len(menus)-1, offset=selected, scaling = 1)
 	selectButton = sensors.button(9)
 	while True:
+		sensors.process()
 		if lastSelected != upDownButtons.getValue():
 			lastSelected = int(upDownButtons.getValue())
 			display.select(lastSelected)
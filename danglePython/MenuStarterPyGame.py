@@ -54,6 +54,7 @@ def DisplayScreenSaver(selected, actionParams):
 	while stopButton.getValue() == 0 and sensors.checkWatchdog() <= 0:
 		time.sleep(0.2)
 		display.processEvents()
+		sensors.process()
 
 def DisplayPositions(selected, actionParams):
 	stopButton = sensors.button(10)
@@ -68,6 +69,7 @@ def DisplayText(selected, actionParams):
 	while stopButton.getValue() == 0 and sensors.checkWatchdog() > 0:
 		time.sleep(0.2)
 		display.processEvents()
+		sensors.process()
 
 	#disp = displayText(display.getDevice(), stopButton, text)
 	#disp.main()
@@ -77,6 +79,7 @@ def GetSelection(selected):
 	upDownButtons = StepUpDownButtonValue(sensors.button(14), sensors.button(13), min = 0, max = len(menus)-1, offset=selected, scaling = 1)
 	selectButton = sensors.button(9)
 	while True:
+		sensors.process()
 		if lastSelected != int(upDownButtons.getValue()):
 			lastSelected = int(upDownButtons.getValue())
 			display.select(lastSelected)
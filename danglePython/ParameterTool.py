@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+# View and change the live parameters (see interfaces/ParameterSharedIPC.py) whilst the robot is running, e.g.
+#	python3 ParameterTool.py list wall.
+#	python3 ParameterTool.py set wall.pid.p 0.02
+#	python3 ParameterTool.py set motor.heading.pid [0.015,0.001,0.0012]
+#	python3 ParameterTool.py save
+import json
+import argparse
+from interfaces.Config import Config
+from interfaces.ParameterSharedIPC import ParameterSharedIPC
+
+def listParameters(parameters, prefix):
+	for name, value in sorted(parameters.getAll().items()):
+		if name.startswith(prefix):
+			print(f"{name} = {json.dumps(value)}")
+
+def setParameter(parameters, name, text):
+	# Values are json, e.g. 0.1, true, [1,2,3]
+	try:
+		value = json.loads(text)
+	except json.JSONDecodeError:
+		print(f"'{text}' is not a valid value")
+		return
+	current = parameters.get(name)
+	if current is None:
+		print(f"Adding new parameter {name}")
+	elif isinstance(current, float) and isinstance(value, int) and not isinstance(value, bool):
+		value = float(value)
+	if parameters.set(name, value):
+		print(f"{name} = {json.dumps(parameters.get(name))}")
+	else:
+		print(f"Unsupported value for {name}: {text}")
+
+def loadParameters(parameters, filename):
+	# Reset the live values to those in the file
+	config = Config(filename)
+	for name, value in config.config.items():
+		parameters.set(name, value)
+	parameters.setSourceHash(config.fileHash)
+	print(f"Loaded from {filename}")
+
+def saveParameters(parameters, filename):
+	# Write the live values back to the file, so they are used from the next reboot
+	config = Config(filename)
+	for name, value in parameters.getAll().items():
+		if config.config.get(name) != value:
+			config.set(name, value)
+	config.save()
+	print(f"Saved to {filename}")
+
+if __name__ == "__main__":
+	ap = argparse.ArgumentParser()
+	ap.add_argument("command", choices=["list", "get", "set", "load", "save"])
+	ap.add_argument("name", nargs="?", default="", help="parameter name (or name prefix for list)")
+	ap.add_argument("value", nargs="?", help="new value for set, as json")
+	ap.add_argument("-f", "--file", type=str, default=Config.LIVE_FILENAME, help="config file for load and save")
+	args = vars(ap.parse_args())
+
+	parameters = ParameterSharedIPC()
+	parameters.create()
+	# Use as is, rather than Config resetting it from an edited file before it can be saved
+	Config.parameters = parameters
+	if args["command"] == "list":
+		listParameters(parameters, args["name"])
+	elif args["command"] == "get":
+		print(json.dumps(parameters.get(args["name"])))
+	elif args["command"] == "set":
+		if args["value"] is None:
+			ap.error("set needs a name and a value")
+		setParameter(parameters, args["name"], args["value"])
+	elif args["command"] == "load":
+		loadParameters(parameters, args["file"])
+	elif args["command"] == "save":
+		saveParameters(parameters, args["file"])
@@ -171,16 +171,7 @@ class EcoDisasterImageCaptureAndAnalysis:
 					self.calculateDistanceAngle(frame, x+w//2, y+h-1)
 				
 					# Add result to end list
-					result = ImageAnalysisSharedIPC.ImageResult(
-						 status = 1,
-						 typename = 'Barrel',
-						 name = colour,
-						 confidence = 90.0,
-						 distance = self.distance,
-						 size = [0,0],
-						 yaw = self.yawHeading,
-						 angle = self.angle )
-					self.results.append(result)
+					self.addResult('Barrel', colour)
 				else:
 					print(f"reject at: {(x,y)}, {len(approx)}, {keepDims}, {keepSolidity}({solidity:0.3f}), {keepAspectRatio}({aspectRatio:0.3f}), area: {area:0.3f}/{hullArea}")
 					# compute the center of the contour region and draw the
@@ -205,6 +196,13 @@ class EcoDisasterImageCaptureAndAnalysis:
 				print(f"reject cnts {len(approx)}")
 		return count
 
+	def addResult(self, typename, name):
+		# Straight into the results buffer, from the last calculateDistanceAngle()
+		# (status, typeid, nameid, confidence, distance, size, yaw, angle, motorpositions)
+		self.resultsIpc.resultsBuffer[self.resultCount] = (1, self.resultsIpc.getStringId(typename), self.resultsIpc.getStringId(name),
+															90.0, self.distance, (0,0), self.yawHeading, self.angle, (0,0))
+		self.resultCount += 1
+
 	def calculateDistanceAngle(self, frame, x, y):
 		# Calculate the angle from the bottom centre to the lowest point
 		self.ourPosition = (frame.shape[1]//2, frame.shape[0] + self.cameraNearestVisiblePixels)
@@ -251,16 +249,7 @@ class EcoDisasterImageCaptureAndAnalysis:
 				self.calculateDistanceAngle(maskedFrame, x+w//2, y+h-1)
 				
 				# Add result to end list
-				result = ImageAnalysisSharedIPC.ImageResult(
-					 status = 1,
-					 typename = 'Region',
-					 name = colour,
-					 confidence = 90.0,
-					 distance = self.distance,
-					 size = [0,0],
-					 yaw = self.yawHeading,
-					 angle = self.angle )
-				self.results.append(result)
+				self.addResult('Region', colour)
 					
 		# Debug output	
 		if self.debugPrint:
@@ -344,16 +333,17 @@ class EcoDisasterImageCaptureAndAnalysis:
 		
 		# Print up the results found
 		print(f"Total time taken {self.elapsed}")
-		print(f"Result count {len(self.results)}")
-		for result in self.results:
-			print(f"{result.typename}.{result.name}")
-			print(f"  d={result.distance:.0f}mm, size={result.size}, yaw={result.yaw:.1f}, angle={result.angle:.1f}")
+		print(f"Result count {self.resultCount}")
+		strings = self.resultsIpc.getStrings()
+		for result in self.resultsIpc.resultsBuffer[:self.resultCount]:
+			print(f"{strings[result['typeid']]}.{strings[result['nameid']]}")
+			print(f"  d={result['distance']:.0f}mm, size={result['size']}, yaw={result['yaw']:.1f}, angle={result['angle']:.1f}")
 
 	#
 	# Share the results for robot code consumption
 	#
 	def publishResults(self):
-		self.resultsIpc.shareResults(self.startTime, self.elapsed, self.results )
+		self.resultsIpc.publishResults(self.startTime, self.elapsed, self.resultCount)
 		
 	#
 	# Debug stuff	
@@ -393,7 +383,7 @@ class EcoDisasterImageCaptureAndAnalysis:
 		
 		# keep looping
 		while True:
-			self.results = []
+			self.resultCount = 0
 			
 			with elapsedTime("Overall", printAtEnd = self.debugPrint) as self.overall:
 				self.startTime = cv2.getTickCount()
@@ -127,6 +127,8 @@ class FishTankImageCaptureAndAnalysis:
 	# Share the results for robot code consumption
 	#
 	def publishResults(self):
+		results = self.resultsIpc.resultsBuffer
+		count = 0
 		for analysis in [self.imageAnalysisFishTankAruco]:
 			if analysis.hasResult:
 				for id in analysis.getIds():
@@ -137,23 +139,15 @@ class FishTankImageCaptureAndAnalysis:
 						yawHeading -= 360.0
 					elif yawHeading < -180.0:
 						yawHeading += 360.0
-					# Add result to end list
-					result = ImageAnalysisSharedIPC.ImageResult(
-						 status = 1,
-						 typename = analysis.name,
-						 name = id,
-						 confidence = 90.0,
-						 distance = distance,
-						 size = [0,0],
-						 yaw = yawHeading,
-						 angle = angle,
-						 motorpositions = self.currentMotorPositions )
-					self.results.append(result)
+					# Add result to end list (status, typeid, nameid, confidence, distance, size, yaw, angle, motorpositions)
+					results[count] = (1, self.resultsIpc.getStringId(analysis.name), self.resultsIpc.getStringId(str(id)), 90.0,
+										distance, (0,0), yawHeading, angle, self.currentMotorPositions)
+					count += 1
 					if self.debugPrint:
-						print(f"{result.typename}.{result.name}")
-						print(f"  d={result.distance:.0f}mm, size={result.size}, yaw={result.yaw:.1f}, angle={result.angle:.1f}")
+						print(f"{analysis.name}.{id}")
+						print(f"  d={distance:.0f}mm, size=[0, 0], yaw={yawHeading:.1f}, angle={angle:.1f}")
 		
-		self.resultsIpc.shareResults(self.startTime, self.elapsed, self.results )
+		self.resultsIpc.publishResults(self.startTime, self.elapsed, count)
 		
 	#
 	# Debug stuff	
@@ -201,8 +195,6 @@ class FishTankImageCaptureAndAnalysis:
 		
 		# keep looping
 		while True:
-			self.results = []
-			
 			with elapsedTime("Overall", printAtEnd = self.debugPrint) as self.overall:
 				self.startTime = cv2.getTickCount()
 				
@@ -0,0 +1,86 @@
+import ctypes
+import errno
+import time
+import numpy as np
+
+# Sleep to an absolute deadline with clock_nanosleep where available, so time spent between deadlines doesn't add to the sleep
+CLOCK_MONOTONIC = 1		# As used by time.monotonic_ns()
+TIMER_ABSTIME = 1
+try:
+	_clock_nanosleep = ctypes.CDLL(None, use_errno=True).clock_nanosleep
+except (OSError, AttributeError):
+	_clock_nanosleep = None
+
+class _timespec(ctypes.Structure):
+	_fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+class FixedRateScheduler:
+	''' Runs a loop at a fixed rate by sleeping to absolute deadlines, one period apart, rather than for a fixed time after each
+		tick's work.  A tick that overruns its period starts the next one straight away and the loop catches up on the
+		following ticks.  If it has overrun by whole periods, those ticks are skipped rather than run back to back.
+		Sleeps wake up a little late by however long the OS takes to reschedule.  Where that jitter matters, spin busy-waits
+		for the last part of each period instead of sleeping, at the cost of that much cpu.
+	'''
+	HISTORY = 1000	# Ticks of lateness kept for getStats()
+
+	def __init__(self, rate, spin = 0.0):
+		self.period = int(1e9 / rate)	# ns
+		self.spin = int(spin * 1e9)
+		self.lateness = np.zeros(FixedRateScheduler.HISTORY)
+		self.reset()
+
+	def reset(self):
+		# Start again from now, e.g. after a deliberate pause, and clear the stats
+		self.deadline = time.monotonic_ns() + self.period
+		self.ticks = 0
+		self.overruns = 0
+		self.skipped = 0
+
+	def sleepUntil(self, deadline):
+		if _clock_nanosleep is not None:
+			ts = _timespec(deadline // 1000000000, deadline % 1000000000)
+			# Returns the error number rather than setting errno.  If interrupted by a signal, carry on to the deadline
+			result = _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(ts), None)
+			while result == errno.EINTR:
+				result = _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(ts), None)
+			if result == 0:
+				return
+		# Not available, or failed (e.g. EINVAL), so sleep for the time remaining instead
+		time.sleep(max(0, deadline - time.monotonic_ns()) / 1e9)
+
+	def wait(self):
+		''' Wait for the start of the next tick.  Returns how late it is starting, in seconds.
+		'''
+		now = time.monotonic_ns()
+		if now >= self.deadline:
+			self.overruns += 1
+			missed = (now - self.deadline) // self.period
+			if missed > 0:
+				self.skipped += missed
+				self.deadline += missed * self.period
+		else:
+			self.sleepUntil(self.deadline - self.spin)
+			while time.monotonic_ns() < self.deadline:
+				pass
+			now = time.monotonic_ns()
+		late = (now - self.deadline) / 1e9
+		self.lateness[self.ticks % FixedRateScheduler.HISTORY] = late
+		self.ticks += 1
+		self.deadline += self.period
+		return late
+
+	def getStats(self):
+		# Counts since reset(), and lateness (seconds) over the last HISTORY ticks
+		lateness = self.lateness[:min(self.ticks, FixedRateScheduler.HISTORY)]
+		stats = {'rate': 1e9 / self.period, 'ticks': self.ticks, 'overruns': self.overruns, 'skipped': self.skipped}
+		if len(lateness) > 0:
+			stats.update({'lateness_mean': float(np.mean(lateness)), 'lateness_p99': float(np.percentile(lateness, 99)),
+						'lateness_max': float(np.max(lateness))})
+		return stats
+
+	def printStats(self):
+		stats = self.getStats()
+		print(f"{stats['ticks']} ticks at {stats['rate']:.0f}Hz, {stats['overruns']} overran, {stats['skipped']} skipped", end="")
+		if 'lateness_mean' in stats:
+			print(f", lateness mean {stats['lateness_mean']*1e6:.0f}us p99 {stats['lateness_p99']*1e6:.0f}us max {stats['lateness_max']*1e6:.0f}us", end="")
+		print()
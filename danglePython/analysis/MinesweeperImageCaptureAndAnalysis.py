@@ -75,6 +75,8 @@ class MinesweeperImageCaptureAndAnalysis:
 		# Results IPC
 		self.results = ImageAnalysisSharedIPC()
 		self.results.create()
+		self.areaTypeId = self.results.getStringId('Area')
+		self.redNameId = self.results.getStringId('Red')
 		
 		# Yaw reading accessor
 		self.sensors = SensorAccessFactory.getSingleton()
@@ -207,16 +209,9 @@ class MinesweeperImageCaptureAndAnalysis:
 				yawHeading -= 360.0
 			elif yawHeading < -180.0:
 				yawHeading += 360.0
-			result0 = ImageAnalysisSharedIPC.ImageResult(
-			 status = 1,
-			 typename = 'Area',
-			 name = 'Red',
-			 confidence = 90.0,
-			 distance = self.distance,
-			 size = [0,0],
-			 yaw = yawHeading,
-			 angle = self.angle )
-			self.results.shareResults(self.startTime, timestamp, [result0] )
+			# (status, typeid, nameid, confidence, distance, size, yaw, angle, motorpositions)
+			self.results.resultsBuffer[0] = (1, self.areaTypeId, self.redNameId, 90.0, self.distance, (0,0), yawHeading, self.angle, (0,0))
+			self.results.publishResults(self.startTime, timestamp, 1)
 		elif self.angle != None:
 			# Ajust angle based on last successful analysis for display only
 			self.angle += (self.lastYaw - self.yaw)
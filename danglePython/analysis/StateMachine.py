@@ -31,6 +31,8 @@ class StateMachine:
 					self.status.setStatus(self.stateDisplayName, self.stateDisplayData, self.stateData)
 				if self.states[self.state][1] != None:
 					self.states[self.state][1](self.stateData)
+		# Write out any status held back by the rate limit
+		self.status.flush()
 
 	def changeState(self, newState, data = None, displayName = None):
 		self.timeout = None
@@ -0,0 +1,51 @@
+import math
+
+class TaskScheduler:
+	''' Runs each task (anything with a process() method) at its own rate, as a whole number of main loop ticks, in the order
+		they were added.  Unless given a phase (the tick within its interval to run on), a task is placed on the tick where
+		it collides least with the slower tasks already added, so they are spread out rather than all landing on one tick.
+	'''
+	def __init__(self, tickRate):
+		self.tickRate = tickRate
+		self.tasks = []		# (process, interval, phase)
+		self.tick = 0
+
+	def add(self, process, rate = None, phase = None):
+		# rate in Hz, None for every tick
+		interval = 1 if rate is None else max(1, round(self.tickRate / rate))
+		if phase is None:
+			phase = self.leastLoadedPhase(interval)
+		self.tasks.append((process, interval, phase % interval))
+
+	def leastLoadedPhase(self, interval):
+		# Tasks with intervals a and b, on phases that are equal modulo gcd(a, b), collide on gcd/b of the first's ticks
+		def load(phase):
+			return sum(math.gcd(interval, other) / other for process, other, otherPhase in self.tasks
+						if other > 1 and (phase - otherPhase) % math.gcd(interval, other) == 0)
+		return min(range(interval), key=load)
+
+	def list(self, rate = None):
+		# Something to pass where a list of processes is expected, appending to it adds tasks at rate by default
+		return TaskList(self, rate)
+
+	def process(self):
+		# Run the tasks due this tick
+		for process, interval, phase in self.tasks:
+			if self.tick % interval == phase:
+				process.process()
+		self.tick += 1
+
+	def processAll(self):
+		# Run every task once, e.g. to set the initial state
+		for process, interval, phase in self.tasks:
+			process.process()
+
+class TaskList:
+	''' Adds tasks to a TaskScheduler through append(), so code that fills in lists of processes can be used unchanged.
+	'''
+	def __init__(self, scheduler, rate):
+		self.scheduler = scheduler
+		self.rate = rate
+
+	def append(self, process, rate = None, phase = None):
+		self.scheduler.add(process, self.rate if rate is None else rate, phase)
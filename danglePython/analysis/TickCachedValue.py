@@ -0,0 +1,33 @@
+from interfaces.SensorInterface import SensorInterface
+from interfaces.IpcBus import IpcBus
+
+class TickCachedValue(SensorInterface):
+	""" Class to evaluate a shared value only once per tick (IpcBus snapshot), returning the same value to every later
+	caller in that tick.  Wrap nodes that have side effects or are costly, e.g. PID error values feeding both motors,
+	where a second call would run the PID again with a tiny dt.  Other attributes are passed through to the wrapped value.
+	Calling one of the MUTATORS, such as setTarget(), also means it is evaluated again on the next call.
+	"""
+	MUTATORS = {'setTarget', 'reset', 'enable', 'disable'}
+
+	def __init__(self, input):
+		SensorInterface.__init__(self)
+		self.input = input
+		self.bus = IpcBus.getSingleton()
+		self.tick = None
+		self.value = None
+
+	def getValue(self):
+		tick = self.bus.getTick()
+		if tick != self.tick:
+			self.value = self.input.getValue()
+			self.tick = tick
+		return self.value
+
+	def __getattr__(self, name):
+		attribute = getattr(self.input, name)
+		if name in TickCachedValue.MUTATORS:
+			def call(*args, **kwargs):
+				self.tick = None
+				return attribute(*args, **kwargs)
+			return call
+		return attribute
@@ -64,6 +64,7 @@ class TidyUpTheToysImageCaptureAndAnalysis:
 		# Results IPC
 		self.resultsIpc = ImageAnalysisSharedIPC()
 		self.resultsIpc.create()
+		self.blockTypeId = self.resultsIpc.getStringId('Block')
 		
 		# Yaw reading accessor
 		self.sensors = SensorAccessFactory.getSingleton()
@@ -149,6 +150,8 @@ class TidyUpTheToysImageCaptureAndAnalysis:
 	# Share the results for robot code consumption
 	#
 	def publishResults(self):
+		results = self.resultsIpc.resultsBuffer
+		count = 0
 		for analysis in [self.imageAnalysisRed, self.imageAnalysisGreen, self.imageAnalysisBlue, self.imageAnalysisYellow]:
 			if analysis.hasResult:
 				distance, angle = analysis.calculateDistanceBearing()
@@ -157,22 +160,14 @@ class TidyUpTheToysImageCaptureAndAnalysis:
 					yawHeading -= 360.0
 				elif yawHeading < -180.0:
 					yawHeading += 360.0
-				# Add result to end list
-				result = ImageAnalysisSharedIPC.ImageResult(
-					 status = 1,
-					 typename = 'Block',
-					 name = analysis.name,
-					 confidence = 90.0,
-					 distance = distance,
-					 size = [0,0],
-					 yaw = yawHeading,
-					 angle = angle,
-					 motorpositions = self.currentMotorPositions )
-				self.results.append(result)
-				print(f"{result.typename}.{result.name}")
-				print(f"  d={result.distance:.0f}mm, size={result.size}, yaw={result.yaw:.1f}, angle={result.angle:.1f}")
+				# Add result to end list (status, typeid, nameid, confidence, distance, size, yaw, angle, motorpositions)
+				results[count] = (1, self.blockTypeId, self.resultsIpc.getStringId(analysis.name), 90.0, distance, (0,0),
+									yawHeading, angle, self.currentMotorPositions)
+				count += 1
+				print(f"Block.{analysis.name}")
+				print(f"  d={distance:.0f}mm, size=[0, 0], yaw={yawHeading:.1f}, angle={angle:.1f}")
 
-		self.resultsIpc.shareResults(self.startTime, self.elapsed, self.results )
+		self.resultsIpc.publishResults(self.startTime, self.elapsed, count)
 		
 	#
 	# Debug stuff	
@@ -227,8 +222,6 @@ class TidyUpTheToysImageCaptureAndAnalysis:
 
 		# keep looping
 		while True:
-			self.results = []
-			
 			with elapsedTime("Overall", printAtEnd = self.debugPrint) as self.overall:
 				self.startTime = cv2.getTickCount()
 				
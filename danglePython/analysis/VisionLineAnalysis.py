@@ -230,7 +230,7 @@ class VisionLineAnalysis:
 			print(f"Assessed angle: {angle:.1f}")
 
 	def applyDirectionHint(self, image):
-		voiceCommand = self.voice.findLastSpokenWord(['left','right','go', 'fast', 'ahead', 'head', 'stop'])
+		voiceCommand = self.voice.findNewSpokenWord(['left','right','go', 'fast', 'ahead', 'head', 'stop'])
 		print(f"voiceCommand: {voiceCommand}")
 		if voiceCommand == 'right':
 			#self.lastMask = self.left_mask
@@ -9,6 +9,7 @@ from interfaces.Config import Config
 # Value providers
 from analysis.SimplePIDErrorValue import SimplePIDErrorValue
 from analysis.HeadingPIDErrorValue import HeadingPIDErrorValue
+from analysis.TickCachedValue import TickCachedValue
 from analysis.OneShotButtonValue import OneShotButtonValue
 from analysis.ToggleButtonValue import ToggleButtonValue
 from analysis.TimedTriggerValue import TimedTriggerValue
@@ -56,7 +57,7 @@ class ChallengeLavaPalava(ChallengeInterface):
 		# Yaw control
 		yaw = self.sensors.yaw()
 		self.pidHeading = PID(self.pidP, self.pidI, self.pidD, sample_time=0.008, proportional_on_measurement=self.proportionalOnMeasure, output_limits=(-1.0, 1.0))
-		self.headingError = HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue())
+		self.headingError = TickCachedValue(HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue()))	# Shared by both motors
 		# Initialise the PID
 		self.headingError.getValue()
 		
@@ -11,6 +11,7 @@ from interfaces.Config import Config
 # Value providers
 from analysis.SimplePIDErrorValue import SimplePIDErrorValue
 from analysis.HeadingPIDErrorValue import HeadingPIDErrorValue
+from analysis.TickCachedValue import TickCachedValue
 from analysis.OneShotButtonValue import OneShotButtonValue
 from analysis.ToggleButtonValue import ToggleButtonValue
 from analysis.TimedTriggerValue import TimedTriggerValue
@@ -482,7 +483,7 @@ class ChallengeTestSequence(ChallengeInterface):
 		yaw = self.sensors.yaw()
 		print(f"Heading PID: {self.pidHeadingConstants}")
 		self.pidHeading = PID(self.pidHeadingConstants[0], self.pidHeadingConstants[1], self.pidHeadingConstants[2], sample_time=0.008, proportional_on_measurement=self.proportionalOnMeasureHeadiing, output_limits=(-1.0, 1.0))
-		self.headingError = HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue(), clampIAt = 10.0)
+		self.headingError = TickCachedValue(HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue(), clampIAt = 10.0))	# Shared by both motors
 		# Initialise the PID
 		self.headingError.reset()
 
@@ -11,6 +11,7 @@ from interfaces.Config import Config
 # Value providers
 from analysis.SimplePIDErrorValue import SimplePIDErrorValue
 from analysis.HeadingPIDErrorValue import HeadingPIDErrorValue
+from analysis.TickCachedValue import TickCachedValue
 from analysis.OneShotButtonValue import OneShotButtonValue
 from analysis.ToggleButtonValue import ToggleButtonValue
 from analysis.TimedTriggerValue import TimedTriggerValue
@@ -54,7 +55,7 @@ class ChallengeUpTheGardenPath(ChallengeInterface):
 		# Yaw control
 		yaw = self.sensors.yaw()
 		self.pidHeading = PID(self.pidP, self.pidI, self.pidD, sample_time=0.008, proportional_on_measurement=self.proportionalOnMeasure, output_limits=(-1.0, 1.0))
-		self.headingError = HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue())
+		self.headingError = TickCachedValue(HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue()))	# Shared by both motors
 		# Initialise the PID
 		self.headingError.getValue()
 		
@@ -108,7 +109,7 @@ class ChallengeUpTheGardenPath(ChallengeInterface):
 				self.status.setStatus(f"Up the", "Garden Path", "Ready")
 			else:
 				# Voice commands
-				voiceCommand = self.voice.findLastSpokenWord(['left','right','go', 'fast', 'ahead', 'stop'])
+				voiceCommand = self.voice.findNewSpokenWord(['left','right','go', 'fast', 'ahead', 'stop'])
 				print(f"voiceCommand: {voiceCommand}")
 				if voiceCommand == 'right' or voiceCommand == 'left' or voiceCommand == 'ahead':
 					self.fullAutoForwardSpeed.setValue(self.constantSpeed)
@@ -139,6 +140,8 @@ class ChallengeUpTheGardenPath(ChallengeInterface):
 			# Maintain position
 			self.pidHeading.auto_mode = False
 			self.headingError.setTarget(self.sensors.yaw().getValue())
+		# Write out any status held back by the rate limit
+		self.status.flush()
 	
 	def stop(self):
 		''' Stop the challenge
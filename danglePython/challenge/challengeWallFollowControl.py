@@ -11,6 +11,7 @@ from interfaces.Config import Config
 # Value providers
 from analysis.SimplePIDErrorValue import SimplePIDErrorValue
 from analysis.HeadingPIDErrorValue import HeadingPIDErrorValue
+from analysis.TickCachedValue import TickCachedValue
 from analysis.OneShotButtonValue import OneShotButtonValue
 from analysis.ToggleButtonValue import ToggleButtonValue
 from analysis.TimedTriggerValue import TimedTriggerValue
@@ -42,25 +43,30 @@ class ChallengeWallFollowControl(ChallengeInterface):
 		self.cameraLevellingControl = CameraLevellingControl()
 		self.zGunControl = ZGunControl()
 		# Get config
-		config = Config()
-		self.pidP = config.get("wall.pid.p", 0.015)
-		self.pidI = config.get("wall.pid.i", 0.0) #0.001)
-		self.pidD = config.get("wall.pid.d", 0.0012)
-		self.proportionalOnMeasure = config.get("wall.pid.pom", False)
-		self.maxForward = config.get("wall.forward.max", 1.0)
-		self.maxManualTurn = config.get("wall.manualturn.max", -15.0)
+		self.config = Config()
+		self.loadConfig()
+		# Only the starting tilt, the buttons adjust it from there
+		self.cameraTilt = self.config.get("wall.camera.tilt", -0.4)
+		self.config.save()
+
+	def loadConfig(self):
+		# Also called to pick up any live changes
+		self.pidP = self.config.get("wall.pid.p", 0.015)
+		self.pidI = self.config.get("wall.pid.i", 0.0) #0.001)
+		self.pidD = self.config.get("wall.pid.d", 0.0012)
+		self.proportionalOnMeasure = self.config.get("wall.pid.pom", False)
+		self.maxForward = self.config.get("wall.forward.max", 1.0)
+		self.maxManualTurn = self.config.get("wall.manualturn.max", -15.0)
 		
-		self.maxHeadingTurn = config.get("wall.headingturn.max", 0.5)
-		self.autoMaxSpeed = config.get("wall.speed", 0.6)
-		self.cameraTilt = config.get("wall.camera.tilt", -0.4)
-		self.leftRightMaxDist = config.get("wall.leftright.maxdist", 600)
-		self.forwardTurnDist = config.get("wall.forward.maxdist", 450)
-		self.wallDistTarget = config.get("wall.targetdist", 305) # 305 ~= 210mm clearance each side
-		self.wallFollowAdjustmentRate = config.get("wall.move.followfactor", 300.0)
-		self.wallFollowMaxAngle = config.get("wall.move.maxfollowangle", 15.0)
-		self.turnAllowedTime = config.get("wall.move.turnspeed", 1.0)
-		self.turnAheadSpeed = config.get("wall.move.turnaheadspeed", 0.4)
-		config.save()
+		self.maxHeadingTurn = self.config.get("wall.headingturn.max", 0.5)
+		self.autoMaxSpeed = self.config.get("wall.speed", 0.6)
+		self.leftRightMaxDist = self.config.get("wall.leftright.maxdist", 600)
+		self.forwardTurnDist = self.config.get("wall.forward.maxdist", 450)
+		self.wallDistTarget = self.config.get("wall.targetdist", 305) # 305 ~= 210mm clearance each side
+		self.wallFollowAdjustmentRate = self.config.get("wall.move.followfactor", 300.0)
+		self.wallFollowMaxAngle = self.config.get("wall.move.maxfollowangle", 15.0)
+		self.turnAllowedTime = self.config.get("wall.move.turnspeed", 1.0)
+		self.turnAheadSpeed = self.config.get("wall.move.turnaheadspeed", 0.4)
 
 	def ControlOff(self):
 		# Stop the motors
@@ -185,7 +191,7 @@ class ChallengeWallFollowControl(ChallengeInterface):
 		# Yaw control
 		yaw = self.sensors.yaw()
 		self.pidHeading = PID(self.pidP, self.pidI, self.pidD, sample_time=0.008, proportional_on_measurement=self.proportionalOnMeasure, output_limits=(-1.0, 1.0))
-		self.headingError = HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue())
+		self.headingError = TickCachedValue(HeadingPIDErrorValue(yaw, self.pidHeading, yaw.getValue()))	# Shared by both motors
 		
 		# Motors
 		motorsStop = FixedValue(0.0)
@@ -194,10 +200,13 @@ class ChallengeWallFollowControl(ChallengeInterface):
 		self.autoModeEnable = ToggleButtonValue(self.sensors.button(5))
 		self.joystickForward = self.sensors.joystickAxis(1)
 		self.joystickLeftRight = self.sensors.joystickAxis(3)
-		self.motorLManualSpeed = [SpeedDirectionCombiner(Scaler(self.joystickForward, scaling = self.maxForward), Scaler(self.headingError, scaling = -self.maxHeadingTurn))]
-		self.motorRManualSpeed = [SpeedDirectionCombiner(Scaler(self.joystickForward, scaling = self.maxForward), Scaler(self.headingError, scaling = self.maxHeadingTurn))]
-		self.motorLAutoSpeed = [SpeedDirectionCombiner(self.autoModeForwardSpeed, Scaler(self.headingError, scaling = -self.maxHeadingTurn))]
-		self.motorRAutoSpeed = [SpeedDirectionCombiner(self.autoModeForwardSpeed, Scaler(self.headingError, scaling = self.maxHeadingTurn))]
+		self.manualForward = Scaler(self.joystickForward, scaling = self.maxForward)
+		self.headingTurnL = Scaler(self.headingError, scaling = -self.maxHeadingTurn)
+		self.headingTurnR = Scaler(self.headingError, scaling = self.maxHeadingTurn)
+		self.motorLManualSpeed = [SpeedDirectionCombiner(self.manualForward, self.headingTurnL)]
+		self.motorRManualSpeed = [SpeedDirectionCombiner(self.manualForward, self.headingTurnR)]
+		self.motorLAutoSpeed = [SpeedDirectionCombiner(self.autoModeForwardSpeed, self.headingTurnL)]
+		self.motorRAutoSpeed = [SpeedDirectionCombiner(self.autoModeForwardSpeed, self.headingTurnR)]
 		self.motorsSpeedMode = ValueAdder([self.motorEnable, self.autoModeEnable], max=2) # 0=off, 1=manual/auto manual forward, 2=full auto
 		# Switch motor speed calculation depending upone what buttons are pressed
 		motorL = SwitchingControlMediator( [motorsStop, self.motorLManualSpeed, self.motorLAutoSpeed],
@@ -222,8 +231,10 @@ class ChallengeWallFollowControl(ChallengeInterface):
 		# LED eyes
 		self.ledEyeLeft = self.controls.led(20)
 		self.ledEyeRight = self.controls.led(21)
-		medPriorityProcesses.append(SimpleControlMediator( Scaler(self.tofLeft, scaling=-1.0, min=0.0, max=1.0, offset=self.leftRightMaxDist), self.ledEyeLeft))
-		medPriorityProcesses.append(SimpleControlMediator( Scaler(self.tofRight, scaling=-1.0, min=0.0, max=1.0, offset=self.leftRightMaxDist), self.ledEyeRight))
+		self.ledEyeLeftLevel = Scaler(self.tofLeft, scaling=-1.0, min=0.0, max=1.0, offset=self.leftRightMaxDist)
+		self.ledEyeRightLevel = Scaler(self.tofRight, scaling=-1.0, min=0.0, max=1.0, offset=self.leftRightMaxDist)
+		medPriorityProcesses.append(SimpleControlMediator( self.ledEyeLeftLevel, self.ledEyeLeft), rate=5)
+		medPriorityProcesses.append(SimpleControlMediator( self.ledEyeRightLevel, self.ledEyeRight), rate=5)
 		
 		# Common controls
 		self.grabberControl.createProcesses(highPriorityProcesses, medPriorityProcesses)
@@ -231,7 +242,20 @@ class ChallengeWallFollowControl(ChallengeInterface):
 		self.zGunControl.createProcesses(highPriorityProcesses, medPriorityProcesses)
 
 	def move(self):
+		if self.config.hasChanged():
+			self.applyConfig()
 		self.stateMachine.process()
+
+	def applyConfig(self):
+		# Live tuning, update everything created from the config
+		self.loadConfig()
+		self.pidHeading.tunings = (self.pidP, self.pidI, self.pidD)
+		self.pidHeading.proportional_on_measurement = self.proportionalOnMeasure
+		self.manualForward.scaling = self.maxForward
+		self.headingTurnL.scaling = -self.maxHeadingTurn
+		self.headingTurnR.scaling = self.maxHeadingTurn
+		self.ledEyeLeftLevel.offset = self.leftRightMaxDist
+		self.ledEyeRightLevel.offset = self.leftRightMaxDist
 	
 	def stop(self):
 		''' Stop the challenge
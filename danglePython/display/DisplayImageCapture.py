@@ -39,6 +39,7 @@ class DisplayImageCapture:
 					pygame.quit()
 					sys.exit()
 			
+			self.sensors.process()
 			res, timestamp, elapsed = self.imageAnalysisResult.updateSnapshot()
 			imageResults = []
 			for i in imageNames:
@@ -3,41 +3,31 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 
 # Interfaces
-from interfaces.ControlAccessFactory import ControlAccessFactory
-from interfaces.SensorAccessFactory import SensorAccessFactory
-from interfaces.VisionAccessFactory import VisionAccessFactory
+from interfaces.TelemetrySharedIPC import TelemetrySharedIPC
 from interfaces.Config import Config
-# Value providers
-from analysis.SimplePIDErrorValue import SimplePIDErrorValue
-from analysis.HeadingPIDErrorValue import HeadingPIDErrorValue
-from analysis.OneShotButtonValue import OneShotButtonValue
-from analysis.FixedValue import FixedValue
-# Value combination helpers
-from analysis.Scaler import Scaler
 
 class MonitorDisplay:
 	def __init__(self):
-		self.controls = ControlAccessFactory.getSingleton()
-		self.sensors = SensorAccessFactory.getSingleton()
-		self.vision = VisionAccessFactory.getSingleton()
+		self.telemetry = TelemetrySharedIPC()
+		self.telemetry.read()
 		# Get config
 		config = Config()
 		self.points = config.get("display.graph.numpoints", 500)
+		# Label, telemetry channel, scaling
+		channels = config.get("display.graph.channels", [
+			["L motor", "motor.left.torque", 1.0],
+			["L position", "motor.left.position", 0.001],
+			["L speed", "motor.left.speed", -1.0/1500],
+			["R motor", "motor.right.torque", 1.0],
+			["R position", "motor.right.position", 0.001],
+			["R speed", "motor.right.speed", 1.0/1500]])
 		config.save()
 		
 		self.fig, self.ax = plt.subplots()
 		self.x = np.arange(0, self.points, 1)
 
-		self.lines = \
-			[(self.ax.plot(self.x, [0.0]*len(self.x), label="L motor")[0], 	 Scaler(self.controls.motor(2), scaling=-1.0)), \
-			(self.ax.plot(self.x, [0.0]*len(self.x), label="L position")[0], Scaler(self.controls.motorPosition(2), scaling=0.001)), \
-			(self.ax.plot(self.x, [0.0]*len(self.x), label="L speed")[0],    Scaler(self.controls.motorSpeed(2), scaling=-1.0/1500)), \
-			(self.ax.plot(self.x, [0.0]*len(self.x), label="R motor")[0],    Scaler(self.controls.motor(1), scaling=1.0)), \
-			(self.ax.plot(self.x, [0.0]*len(self.x), label="R position")[0], Scaler(self.controls.motorPosition(1), scaling=0.001)), \
-			(self.ax.plot(self.x, [0.0]*len(self.x), label="R speed")[0],    Scaler(self.controls.motorSpeed(1), scaling=1.0/1500)) ]
-			#(self.ax.plot(self.x, [0.0]*len(self.x), label="F Joystick")[0], Scaler(self.sensors.joystickAxis(1), scaling=1.0), \
-			#(self.ax.plot(self.x, [0.0]*len(self.x), label="Heading")[0],    Scaler(self.sensors.yaw(), scaling=1/180.0), \
-			#(self.ax.plot(self.x, [0.0]*len(self.x), label="Vision")[0],     Scaler(self.vision.getLineHeading(), scaling=1/180.0)
+		# Every sample pushed is plotted, not just the latest at each animation frame
+		self.lines = [(self.ax.plot(self.x, [0.0]*len(self.x), label=label)[0], channel, scaling) for label, channel, scaling in channels]
 		plt.ylabel('value')
 		plt.legend(loc=(0.01, 1.0 - 0.04*len(self.lines)))
 		
@@ -49,7 +39,7 @@ class MonitorDisplay:
 		if event.key == 'p':
 			self.pause ^= True
 			self.ani._blit = not self.pause
-			for line, valueprovider in self.lines:
+			for line, channel, scaling in self.lines:
 				line.set_animated(not self.pause)
 			#if self.pause:
 			#	self.ani.event_source.stop()
@@ -61,21 +51,21 @@ class MonitorDisplay:
 			self.save("monitor.mp4")
 			
 	def init(self):  # only required for blitting to give a clean slate.
-		for line, valueprovider in self.lines:
+		for line, channel, scaling in self.lines:
 			line.set_ydata([np.nan] * len(self.x))
 		self.ax.set_ylim((-1.05,1.05))
 		return [row[0] for row in self.lines]
 
 	def animate(self, i):
-		# update readings
-		self.sensors.process()
+		# update readings, everything since the last frame in one go
+		records = self.telemetry.drain()
+		names = self.telemetry.channelName(records['channel'])
 		#print(i) #len(pitch),pitch)
 		#self.ani._blit_cache.clear()
 		if not self.pause:
-			for line, valueprovider in self.lines:
-				newline = line.get_ydata()
-				newline.pop(0)
-				newline.append(valueprovider.getValue())
+			for line, channel, scaling in self.lines:
+				values = records['value'][names == channel] * scaling
+				newline = np.concatenate((line.get_ydata(), values))[-self.points:]
 				#print(f"{newline}")
 				line.set_ydata(newline)
 				#line.set_data(range(len(newline)),newline)
@@ -36,6 +36,7 @@ class DisplayStatus:
         last_title = "x"
         last_subtitle = ""
         last_additional = ""
+        last_generation = None
         while last_title != "quit quit quit" :
             for event in pygame.event.get():
                 if event.type == pygame.QUIT or \
@@ -44,10 +45,11 @@ class DisplayStatus:
                     #pygame.quit()
                     sys.exit()
 
-            # Get the next text
-            title = self.results.getTitle()
-            subtitle = self.results.getSubtitle()
-            additional = self.results.getAdditional()
+            # Get the next text, only when it has been published again
+            generation = self.results.getGeneration()
+            if generation != last_generation:
+                last_generation = generation
+                title, subtitle, additional = self.results.get_all()
             
             if last_title != title or last_subtitle != subtitle or last_additional != additional:
                 last_title = title
@@ -83,5 +85,5 @@ class DisplayStatus:
                     
                 pygame.display.flip()
 
-            # limit update rate
-            self.clock.tick(20) #frames/sec
+            # Wait for the next status change, but still handle events at least 20 times/sec
+            self.results.waitForUpdate(0.05)
@@ -33,6 +33,7 @@ class displayText:
 		with canvas(self.device) as draw:
 			self.show(draw)
 		while True:
+			SensorAccessFactory.getSingleton().process()
 			if self.stopButton.getValue() > 0 or SensorAccessFactory.getSingleton().checkWatchdog() <= 0:
 				return
 			time.sleep(0.2)
@@ -52,6 +52,7 @@ class Simulation:
 			self.screen.fill((64,64,64))
 
 			# Read the next position from input to front of list
+			SensorAccessFactory.getSingleton().process()
 			for s in range(len(self.sensors)):
 				self.distances[s].insert(0, self.sensors[s].getValue())
 				if len(self.distances[s]) > 100:
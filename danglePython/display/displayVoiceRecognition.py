@@ -68,5 +68,5 @@ class DisplayVoiceRecognition:
                     
                 pygame.display.flip()
 
-            # limit update rate
-            self.clock.tick(20) #frames/sec
+            # Wait for the next result, but still handle events at least 20 times/sec
+            self.results.waitForUpdate(0.05)
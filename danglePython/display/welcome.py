@@ -14,6 +14,7 @@ from display.demo_opts import get_device
 from luma.core.virtual import viewport, snapshot, range_overlap
 from luma.core.sprite_system import framerate_regulator
 from PIL import ImageFont
+from interfaces.SensorAccessFactory import SensorAccessFactory
 
 # Messages - max length at smallest font is around 24 chars
 welcome = [
@@ -97,6 +98,12 @@ def overlapping(pt_a, pt_b, w, h):
     return range_overlap(la, ra, lb, rb) and range_overlap(ta, ba, tb, bb)
 
 
+def stop_requested(stopButton):
+    # Refresh the sensor snapshot the button reads from
+    SensorAccessFactory.getSingleton().process()
+    return stopButton.getValue() > 0
+
+
 def showWelcomeSequence(device, stopButton):
     regulator = framerate_regulator(fps=30)
     fonts = [make_font("code2000.ttf", sz) for sz in range(36*3, 8, -2)]
@@ -121,12 +128,12 @@ def showWelcomeSequence(device, stopButton):
         virtual.set_position(posn_a)
         for _ in range(30):
             with regulator:
-                if stopButton.getValue() > 0:
+                if stop_requested(stopButton):
                     return
         
         for posn in lerp_2d(posn_a, posn_b, device.width // 6):
             with regulator:
-                if stopButton.getValue() > 0:
+                if stop_requested(stopButton):
                     return
                 virtual.set_position(posn)
 
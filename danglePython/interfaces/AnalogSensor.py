@@ -1,4 +1,5 @@
 from interfaces.SensorInterface import SensorInterface
+from interfaces.SensorsSharedIPC import SensorsSharedIPC
 
 class AnalogSensor(SensorInterface):
 	""" Class to get an analog sensor reading. 
@@ -8,7 +9,12 @@ class AnalogSensor(SensorInterface):
 		SensorInterface.__init__(self)
 		self.sensorIPC = sensorIPC
 		self.sensor = sensor
+		self.channel = sensorIPC.snapshotData[0]['analog'][sensor]
 		
 	def getValue(self):
-		return self.sensorIPC.getAnalogValue(self.sensor)
+		return self.channel['value']
+
+	def getHistory(self, n = SensorsSharedIPC.HISTORY_SIZE):
+		# Last n samples (timestamp and value) up to the current snapshot
+		return self.sensorIPC.getAnalogHistory(self.sensor, n, self.channel['samples'])
 	
\ No newline at end of file
@@ -11,9 +11,10 @@ class Button(SensorInterface):
 		SensorInterface.__init__(self)
 		self.sensorIPC = sensorIPC
 		self.button = button
+		self.channel = sensorIPC.snapshotData[0]['digital'][button]
 		
 	def getValue(self):
-		return self.sensorIPC.getDigitalValue(self.button)
+		return self.channel['value']
 		
 	def setValue(self, value, status=1):
 		self.sensorIPC.setDigitalValue(self.button, value, status=status)
@@ -6,6 +6,9 @@ class ChallengeInterface:
 
 	@abstractmethod
 	def createProcesses(self):
+		''' Append the challenge's processes to the high (every tick) and medium priority lists.  Either also takes a rate
+			(Hz) and phase, e.g. medPriorityProcesses.append(blinker, rate=2), see TaskScheduler.
+		'''
 		pass
 
 	def start(self):
@@ -1,31 +1,74 @@
 import json
+import zlib
+from interfaces.ParameterSharedIPC import ParameterSharedIPC
 
 class Config:
-	def __init__(self, filename='config.json'):
+	''' Settings from a json file, with the file's defaults added on first use.
+		The main config.json is also live: its numeric and boolean settings are shared through ParameterSharedIPC, so get()
+		returns the value as last set by ParameterTool.py.  Call hasChanged() once a tick and re-get() any tunables when it
+		returns True.  If config.json has been edited since the live values were seeded, the first Config created in a
+		process seeds them again from the file.
+	'''
+	LIVE_FILENAME = 'config.json'
+	parameters = None
+	warned = set()		# Keys already reported as differing from the file
+
+	def __init__(self, filename=LIVE_FILENAME):
 		self.filename = filename
 		try:
-			with open(self.filename, 'r') as f:
-				self.config = json.load(f)
+			with open(self.filename, 'rb') as f:
+				contents = f.read()
+			self.config = json.loads(contents)
+			self.fileHash = zlib.crc32(contents)
 			self.configChanged = False
 		except:
 			self.config = {}
+			self.fileHash = 0
 			self.configChanged = True
+		self.live = filename == Config.LIVE_FILENAME
+		if self.live:
+			if Config.parameters is None:
+				Config.parameters = ParameterSharedIPC()
+				Config.parameters.create()
+				if Config.parameters.reseed(self.config, self.fileHash):
+					print(f"Config: live parameters reset from {self.filename}")
+			self.generation = Config.parameters.getGeneration()
 
 	def get(self, key, default):
 		if key in self.config:
-			return self.config[key]
+			value = self.config[key]
 		else:
 			self.config[key] = default
 			self.configChanged = True
-			return default
-	 
+			value = default
+		if self.live:
+			live = Config.parameters.seed(key, value)
+			if ParameterSharedIPC.encode(live) != ParameterSharedIPC.encode(value) and key not in Config.warned:
+				Config.warned.add(key)
+				print(f"Config: using live value {key} = {live}, {self.filename} has {value}")
+			return live
+		return value
+
+	def hasChanged(self):
+		# True if any live value has been changed since the last call (or since this Config was created)
+		if not self.live:
+			return False
+		generation = Config.parameters.getGeneration()
+		if generation == self.generation:
+			return False
+		self.generation = generation
+		return True
+
 	def set(self, key, value):
 		self.config[key] = value
 		self.configChanged = True
-			
+
 	def save(self):
 		if self.configChanged:
-			with open(self.filename, 'w+') as f:
-				json.dump(self.config, f, indent=2, sort_keys=True)
+			contents = json.dumps(self.config, indent=2, sort_keys=True).encode()
+			with open(self.filename, 'wb') as f:
+				f.write(contents)
 			self.configChanged = False
-
+			if self.live:
+				# Only defaults were added, so don't let that reset any live changes
+				Config.parameters.setSourceHash(zlib.crc32(contents))
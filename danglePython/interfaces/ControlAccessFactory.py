@@ -9,6 +9,7 @@ from interfaces.ServoControlSharedIPC import ServoControlSharedIPC
 from interfaces.SimpleControlSharedIPC import SimpleControlSharedIPC
 from interfaces.MotorControlSharedIPC import MotorControlSharedIPC
 from interfaces.LedAccessor import LedAccessor
+from interfaces.IpcBus import IpcBus
 
 class ControlAccessFactory:
 
@@ -20,6 +21,8 @@ class ControlAccessFactory:
 		self.servosIPC.open()
 		self.simpleControlsIPC = SimpleControlSharedIPC()
 		self.simpleControlsIPC.open()
+		# Motor feedback is read from the per-tick snapshot
+		IpcBus.getSingleton().attachMotors(self.motorsIPC)
 
 	__instance = None
 	@classmethod
@@ -29,12 +32,14 @@ class ControlAccessFactory:
 		return cls.__instance
 		
 	def process(self):
-		# Do common processing of state
-		pass
+		# Publish this tick's control values to any waiting process
+		self.motorsIPC.publish()
+		self.servosIPC.publish()
+		self.simpleControlsIPC.publish()
 		
 	def stopAllMotors(self):
-		self.motorsIPC.resetWatchdog(0)
-		self.servosIPC.resetWatchdog(0)
+		self.motorsIPC.resetWatchdog(False)
+		self.servosIPC.resetWatchdog(False)
 		#redboard.M1(0.0)
 		#redboard.M2(0.0)
 
@@ -43,9 +48,9 @@ class ControlAccessFactory:
 		#redboard.led_off()
 		#redboard.Stop() # This destroys everying and stops the motors
 
-	def resetWatchdog(self, count = 100):
-		self.motorsIPC.resetWatchdog(count)
-		self.servosIPC.resetWatchdog(count)
+	def resetWatchdog(self, alive = True):
+		self.motorsIPC.resetWatchdog(alive)
+		self.servosIPC.resetWatchdog(alive)
 		
 	def checkWatchdog(self):
 		return self.sensorsIPC.checkWatchdog()
@@ -8,11 +8,12 @@ class CounterChangeSensor(SensorInterface):
 		SensorInterface.__init__(self)
 		self.sensorIPC = sensorIPC
 		self.sensor = sensor
+		self.channel = sensorIPC.snapshotData[0]['counter'][sensor]
 		
 	def getValue(self):
-		return self.sensorIPC.getCounterRateOfChange(self.sensor)
+		return self.channel['rateOfChange']
 
 	def getCounter(self):
-		return self.sensorIPC.getCounterValue(self.sensor)
+		return self.channel['value']
 	
 	
\ No newline at end of file
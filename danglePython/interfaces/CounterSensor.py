@@ -1,4 +1,5 @@
 from interfaces.SensorInterface import SensorInterface
+from interfaces.SensorsSharedIPC import SensorsSharedIPC
 
 class CounterSensor(SensorInterface):
 	""" Class to get an analog sensor reading. 
@@ -8,10 +9,15 @@ class CounterSensor(SensorInterface):
 		SensorInterface.__init__(self)
 		self.sensorIPC = sensorIPC
 		self.sensor = sensor
+		self.channel = sensorIPC.snapshotData[0]['counter'][sensor]
 		
 	def getValue(self):
-		return self.sensorIPC.getCounterValue(self.sensor)
+		return self.channel['value']
 	
 	def getRateOfChange(self):
-		return self.sensorIPC.getCounterRateOfChange(self.sensor)
+		return self.channel['rateOfChange']
+
+	def getHistory(self, n = SensorsSharedIPC.HISTORY_SIZE):
+		# Last n samples (timestamp and value) up to the current snapshot
+		return self.sensorIPC.getCounterHistory(self.sensor, n, self.channel['samples'])
 	
\ No newline at end of file
@@ -0,0 +1,46 @@
+import ctypes
+import platform
+import time
+
+# Minimal futex wrapper used to block on a 32-bit word in shared memory until a writer changes it.
+# Falls back to polling where the futex syscall isn't available.
+FUTEX_WAIT = 0
+FUTEX_WAKE = 1
+WAKE_ALL = 0x7fffffff
+POLL_INTERVAL = 0.001	# Fallback poll period, seconds
+
+_SYS_futex = {'x86_64': 202, 'aarch64': 98, 'armv6l': 240, 'armv7l': 240, 'i686': 240}.get(platform.machine())
+try:
+	_libc = ctypes.CDLL(None, use_errno=True)
+	_syscall = _libc.syscall
+except (OSError, AttributeError):
+	_SYS_futex = None
+
+class _timespec(ctypes.Structure):
+	_fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+def wake(word):
+	''' Wake all processes waiting on word, a single element uint32 numpy array in shared memory
+	'''
+	if _SYS_futex is not None:
+		_syscall(_SYS_futex, ctypes.c_void_p(word.ctypes.data), FUTEX_WAKE, WAKE_ALL, None, None, 0)
+
+def waitForChange(word, value, timeout = None, poll = False):
+	''' Block until word[0] differs from value or timeout (seconds) expires.
+		With poll set it polls rather than using the futex, e.g. for a writer that only wakes readers it knows are waiting.
+		Returns the current value of word[0].
+	'''
+	deadline = None if timeout is None else time.monotonic() + timeout
+	current = word[0]
+	while current == value:
+		remaining = None if deadline is None else deadline - time.monotonic()
+		if remaining is not None and remaining <= 0:
+			break
+		if _SYS_futex is None or poll:
+			time.sleep(POLL_INTERVAL if remaining is None else min(remaining, POLL_INTERVAL))
+		else:
+			ts = None if remaining is None else ctypes.byref(_timespec(int(remaining), int((remaining % 1) * 1e9)))
+			# Returns straight away if the word has already changed, so no update can be missed
+			_syscall(_SYS_futex, ctypes.c_void_p(word.ctypes.data), FUTEX_WAIT, ctypes.c_uint32(int(value)), ts, None, 0)
+		current = word[0]
+	return current
@@ -1,12 +1,13 @@
 import numpy as np
-from collections import namedtuple
+from interfaces.SharedIPC import SharedIPC
 
-class ImageAnalysisSharedIPC:
+class ImageAnalysisSharedIPC(SharedIPC):
 	# Structure of the image analysis shared memory
+	# Type and object names are held once in a string table, and referred to by index in each result
 	image_analysis_dt = np.dtype([
 					('status', np.uint16),	# 0=no value, 1=valid value
-					('typename', np.dtype('U32')),	# E.g. "Person"
-					('name', np.dtype('U32')),		# E.g. "Fred bloggs"
+					('typeid', np.uint16),	# E.g. "Person"
+					('nameid', np.uint16),	# E.g. "Fred bloggs"
 					('confidence',np.float32),		# Match confidence 1-100%
 					('distance',np.float32),# Estimated distance to nearest point of object (in mm)
 					('size',np.float32,(2)),# Estimated size of bounding rectangle of object (in mm)
@@ -14,112 +15,149 @@ class ImageAnalysisSharedIPC:
 					('angle',np.float32),	# Relative angle to centre of object
 					('motorpositions',np.int64, (2))	# Motor position sensors at time of image capture
 					])
-	image_analysis_shared_dt = np.dtype([
+	# As returned to readers, with the names looked up
+	image_result_dt = np.dtype([
+					('status', np.uint16),
+					('typename', np.dtype('U32')),
+					('name', np.dtype('U32'))] + image_analysis_dt.descr[3:])
+	# Results are double buffered, the producer fills in the inactive bank then flips activebank so readers never see a
+	# mix of two frames
+	image_analysis_frame_dt = np.dtype([
+					('sequence',np.uint32),	# Odd whilst the bank is being written
+					('frame',np.uint32),	# Frame number, incremented for each frame published
 					('timestamp',np.uint64),
 					('elapsed',np.float32),	# Time taken to do the analysis
-					('watchdog',np.uint16),
 					('numberimages',np.uint16),
 					('images',image_analysis_dt, (64))])
+	image_analysis_shared_dt = np.dtype([
+					('heartbeat',np.float64),
+					('activebank',np.uint16),	# Bank holding the latest complete frame
+					('banks',image_analysis_frame_dt, (2)),
+					('numberstrings',np.uint16),	# Only ever appended to, entry 0 is ''
+					('strings',np.dtype('U32'), (64))])
+	shared_dt = image_analysis_shared_dt
 	filename = '/dev/shm/image_analysis_shared.mmf'
 
-	# Interface class to set the results array
-	ImageResult = namedtuple('ImageResult', 'status typename name confidence distance size yaw angle motorpositions')
-	
-	def create(self):
-		try:
-			# Try existing file first
-			self.data  = np.memmap(ImageAnalysisSharedIPC.filename, offset=0, dtype=ImageAnalysisSharedIPC.image_analysis_shared_dt, mode='r+', shape=(1))
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(ImageAnalysisSharedIPC.filename, offset=0, dtype=ImageAnalysisSharedIPC.image_analysis_shared_dt, mode='w+', shape=(1))
-	
-	def read(self):
-		# Read only
-		try:
-			# Try existing file first
-			self.data  = np.memmap(ImageAnalysisSharedIPC.filename, offset=0, dtype=ImageAnalysisSharedIPC.image_analysis_shared_dt, mode='r')
-		except:
-			# Need to create first
-			self.data  = np.memmap(ImageAnalysisSharedIPC.filename, offset=0, dtype=ImageAnalysisSharedIPC.image_analysis_shared_dt, mode='w+', shape=(1))
+	def attachViews(self, data):
+		# Views are indexed [bank] or [bank, result]
+		self._activebank = data['activebank']
+		banks = data['banks'][0]
+		self._banks = banks
+		self._sequence = banks['sequence']
+		self._frame = banks['frame']
+		self._timestamp = banks['timestamp']
+		self._elapsed = banks['elapsed']
+		self._numberimages = banks['numberimages']
+		self._images = banks['images']
+		self._status = self._images['status']
+		self._typeid = self._images['typeid']
+		self._nameid = self._images['nameid']
+		self._confidence = self._images['confidence']
+		self._distance = self._images['distance']
+		self._size = self._images['size']
+		self._yaw = self._images['yaw']
+		self._angle = self._images['angle']
+		self._motorpositions = self._images['motorpositions']
+		# Latest frame as captured by snapshotFrame(), preallocated so views into it stay valid
+		self.frameSnapshot = np.zeros(1, dtype=ImageAnalysisSharedIPC.image_analysis_frame_dt)
+		self._frameBuffer = np.zeros(1, dtype=ImageAnalysisSharedIPC.image_analysis_frame_dt)
+		# Local results for producers to fill in before calling publishResults(), a row at a time as a tuple in
+		# image_analysis_dt order, with names from getStringId()
+		self.resultsBuffer = np.zeros(self._images.shape[1], dtype=ImageAnalysisSharedIPC.image_analysis_dt)
 			
-	def shareResults(self, timestamp, elapsed, results):
-		self.data[0]['timestamp'] = timestamp
-		self.data[0]['elapsed'] = elapsed
-		self.data[0]['numberimages'] = len(results)
-		for result in range(len(results)):
-			res = self.data[0]['images'][result]
-			res['status'] = results[result].status
-			res['typename'] = results[result].typename
-			res['name'] = results[result].name
-			res['confidence'] = results[result].confidence
-			res['distance'] = results[result].distance
-			res['size'] = results[result].size
-			res['yaw'] = results[result].yaw
-			res['angle'] = results[result].angle
-			res['motorpositions'] = results[result].motorpositions
-		# Invalidate the rest
-		for result in range(len(results), len(self.data[0]['images'])):
-			self.data[0]['images'][result]['status'] = 0	# Invalid
+	def publishResults(self, timestamp, elapsed, count, status = 0):
+		''' Publish the first count rows of resultsBuffer as a new frame.  The rest are marked with status.
+		'''
+		active = self._activebank[0]
+		bank = 1 - active
+		self._sequence[bank] += 1	# Odd, a slow reader still copying this bank will retry
+		self._frame[bank] = self._frame[active] + 1
+		self._timestamp[bank] = timestamp
+		self._elapsed[bank] = elapsed
+		self._numberimages[bank] = count
+		self._images[bank, :count] = self.resultsBuffer[:count]
+		self._status[bank, count:] = status
+		self._sequence[bank] += 1
+		# Flip, readers now see the new frame
+		self._activebank[0] = bank
+		self.publish()
 			
 	def noResults(self, status = 0):
-		for result in range(len(self.data[0]['images'])):
-			self.data[0]['images'][result]['status'] = status	# Set Invalid
+		self.publishResults(self.getTimestamp(), self.getElapsed(), 0, status)
+
+	def copyFrame(self, out):
+		# Consistent copy of the latest frame into out, a 1 element array of image_analysis_frame_dt
+		while True:
+			bank = self._activebank[0]
+			sequence = self._sequence[bank]
+			if sequence & 1 == 0:
+				np.copyto(out, self._banks[bank:bank+1])
+				if self._sequence[bank] == sequence:
+					return out
+
+	def snapshotFrame(self):
+		# Update frameSnapshot, only copying if there is a new frame
+		if self.getFrame() != self.frameSnapshot['frame'][0]:
+			self.copyFrame(self.frameSnapshot)
+		return self.frameSnapshot
+
+	def readFrame(self):
+		''' Consistent copy of the latest frame as (frame, timestamp, elapsed, results), see resultsFromFrame()
+		'''
+		return self.resultsFromFrame(self.copyFrame(self._frameBuffer)[0])
+
+	def resultsFromFrame(self, frame):
+		''' Results from a copied frame as (frame, timestamp, elapsed, results).
+			Results are a read-only record array.  It can be filtered with boolean masks, e.g. results[results.typename == 'Block'],
+			and each row's fields are available as attributes, e.g. results[0].distance.
+		'''
+		images = frame['images'][:frame['numberimages']]
+		results = np.empty(len(images), dtype=ImageAnalysisSharedIPC.image_result_dt).view(np.recarray)
+		for field in ImageAnalysisSharedIPC.image_analysis_dt.names[3:]:
+			results[field] = images[field]
+		results['status'] = images['status']
+		strings = self.getStrings()
+		results['typename'] = strings[images['typeid']]
+		results['name'] = strings[images['nameid']]
+		results.flags.writeable = False
+		return frame['frame'], frame['timestamp'], frame['elapsed'], results
+
+	def getFrame(self):
+		# Number of the latest frame, cheap to compare against that returned by readFrame() to see if anything is new
+		return self._frame[self._activebank[0]]
 
 	def getImageResults(self):
-		results = []
-		for result in range(self.data[0]['numberimages']):
-			res = self.data[0]['images'][result]
-			results.append(
-				ImageAnalysisSharedIPC.ImageResult(
-					status = res['status'].copy(),
-					typename = res['typename'].copy(),
-					name = res['name'].copy(),
-					confidence = res['confidence'].copy(),
-					distance = res['distance'].copy(),
-					size = res['size'].copy(),
-					yaw = res['yaw'].copy(),
-					angle = res['angle'].copy(),
-					motorpositions = res['motorpositions'].copy() ))
-		return results
+		return self.readFrame()[3]
 			
 	def getTimestamp(self):
-		return self.data[0]['timestamp'].copy()
+		return self._timestamp[self._activebank[0]]
 	
 	def getElapsed(self):
-		return self.data[0]['elapsed'].copy()
+		return self._elapsed[self._activebank[0]]
 		
 	def getStatus(self, result):
-		return self.data[0]['images'][result]['status']
+		return self._status[self._activebank[0], result]
 	
 	def getTypeName(self, result):
-		return self.data[0]['images'][result]['typename']
+		return self.getStrings()[self._typeid[self._activebank[0], result]]
 		
 	def getName(self, result):
-		return self.data[0]['images'][result]['name']
+		return self.getStrings()[self._nameid[self._activebank[0], result]]
 		
 	def getYaw(self, result):
-		return self.data[0]['images'][result]['yaw']
+		return self._yaw[self._activebank[0], result]
 		
 	def getAngle(self, result):
-		return self.data[0]['images'][result]['angle']
+		return self._angle[self._activebank[0], result]
 		
 	def getDistance(self, result):
-		return self.data[0]['images'][result]['distance']
+		return self._distance[self._activebank[0], result]
 		
 	def getSize(self, result):
-		return self.data[0]['images'][result]['size']
+		return self._size[self._activebank[0], result]
 
 	def getConfidence(self, result):
-		return self.data[0]['images'][result]['confidence']
+		return self._confidence[self._activebank[0], result]
 		
 	def getMotorPositions(self, result):
-		return self.data[0]['images'][result]['motorpositions']
-
-	def checkWatchdog(self):
-		if self.data[0]['watchdog'] > 0:
-			# countdown
-			self.data[0]['watchdog'] -= 1
-		return self.data[0]['watchdog']
-	def resetWatchdog(self, count = 100):
-		self.data[0]['watchdog'] = count
-
+		return self._motorpositions[self._activebank[0], result]
@@ -7,34 +7,51 @@ class ImageResult(SensorInterface):
 	def __init__(self, visionIPC):
 		SensorInterface.__init__(self)
 		self.visionIPC = visionIPC
+		self.frame = None
+		# Frame captured by the last snapshot
+		self.frameSnapshot = visionIPC.frameSnapshot[0]
+		self.firstResult = self.frameSnapshot['images'][0]
 		
 	def getValue(self):
-		#print(f"yaw: {self.visionIPC.getYaw(0)}")
-		return self.visionIPC.getYaw(0)
+		return self.firstResult['yaw']
 			
 	def getStatus(self):
-		#print(f"{self.visionIPC.getTypeName(0)}:{self.visionIPC.getName(0)}: status: {self.visionIPC.getStatus(0)}")
-		return self.visionIPC.getStatus(0)
+		return self.firstResult['status']
 			
 	def getDistance(self):
-		#print(f"distance: {self.visionIPC.getDistance(0)}")
-		return self.visionIPC.getDistance(0)
+		return self.firstResult['distance']
 		
 	def updateSnapshot(self):
-		self.imageResults = self.visionIPC.getImageResults()
-		self.timestamp = self.visionIPC.getTimestamp()
-		self.elapsed = self.visionIPC.getElapsed()
+		# Results from the frame in the last snapshot, only re-read and rebuild the lookups when it is a new frame
+		if self.hasNewFrame():
+			self.frame, self.timestamp, self.elapsed, self.imageResults = self.visionIPC.resultsFromFrame(self.frameSnapshot)
+			self.buildIndex()
 		return self.imageResults,self.timestamp,self.elapsed
 	
+	def hasNewFrame(self):
+		# True if the last snapshot captured a new frame since updateSnapshot() was called
+		return self.frame != self.frameSnapshot['frame']
+		
+	def buildIndex(self):
+		# Rows for each type and (name, type), so lookups don't need to search the results
+		byType = {}
+		byNameAndType = {}
+		for row, (name, typeName) in enumerate(zip(self.imageResults.name, self.imageResults.typename)):
+			byType.setdefault(typeName, []).append(row)
+			byNameAndType.setdefault((name, typeName), []).append(row)
+		self.byType = {key: self.imageResults[rows] for key, rows in byType.items()}
+		self.byNameAndType = {key: self.imageResults[rows] for key, rows in byNameAndType.items()}
+		self.noResults = self.imageResults[:0]
+		
 	# These methods work on the last snapshot taken
 	def getImageResults(self):
 		return self.imageResults
 
 	def getImageResultByType(self, typeName):
-		return list(filter(lambda i: i.typename == typeName, self.imageResults))
+		return self.byType.get(typeName, self.noResults)
 				
 	def getImageResultByNameAndType(self, name, typeName):
-		return list(filter(lambda i: i.name == name and i.typename == typeName, self.imageResults))
+		return self.byNameAndType.get((name, typeName), self.noResults)
 		
 	def getTimestamp(self):
 		return self.timestamp
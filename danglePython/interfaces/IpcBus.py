@@ -0,0 +1,72 @@
+import time
+import numpy as np
+from interfaces.SensorsSharedIPC import SensorsSharedIPC
+from interfaces.MotorControlSharedIPC import MotorControlSharedIPC
+from interfaces.LineAnalysisSharedIPC import LineAnalysisSharedIPC
+from interfaces.ImageAnalysisSharedIPC import ImageAnalysisSharedIPC
+
+class IpcBus:
+	''' Captures all the attached shared memory segments together, once per tick, so every decision made in that tick sees
+		values from the same instant.  The factories attach their segments and point the segments' snapshot buffers into
+		one preallocated structure here, so the accessors they hand out read from it.  Each segment is copied using its
+		own consistency scheme (seqlocks, double buffered frames).
+	'''
+	bus_dt = np.dtype([
+					('timestamp', np.float64),	# time.monotonic() of the snapshot
+					('tick', np.uint32),
+					('sensors', SensorsSharedIPC.sensors_channels_dt),
+					('motors', MotorControlSharedIPC.motor_feedback_dt, (8)),
+					('line', LineAnalysisSharedIPC.line_analysis_frame_dt),
+					('image', ImageAnalysisSharedIPC.image_analysis_frame_dt)], align=True)
+
+	def __init__(self):
+		self.data = np.zeros(1, dtype=IpcBus.bus_dt)
+		self.mpu = None
+		self.sensorsIPC = None
+		self.motorsIPC = None
+		self.lineIPC = None
+		self.imageIPC = None
+
+	__instance = None
+	@classmethod
+	def getSingleton(cls):
+		if cls.__instance == None:
+			cls.__instance = IpcBus()
+		return cls.__instance
+
+	# Attach before any accessors are created, as they keep views into the snapshot buffers
+	def attachMpu(self, mpu):
+		self.mpu = mpu
+	def attachSensors(self, sensorsIPC):
+		self.sensorsIPC = sensorsIPC
+		sensorsIPC.snapshotData = self.data['sensors']
+	def attachMotors(self, motorsIPC):
+		self.motorsIPC = motorsIPC
+		motorsIPC.feedbackSnapshot = self.data['motors'][0]
+	def attachLine(self, lineIPC):
+		self.lineIPC = lineIPC
+		lineIPC.frameSnapshot = self.data['line']
+	def attachImage(self, imageIPC):
+		self.imageIPC = imageIPC
+		imageIPC.frameSnapshot = self.data['image']
+
+	def snapshot(self):
+		self.data['timestamp'] = time.monotonic()
+		self.data['tick'] += 1
+		if self.mpu is not None:
+			self.mpu.updateReading()
+		if self.sensorsIPC is not None:
+			self.sensorsIPC.snapshot()
+		if self.motorsIPC is not None:
+			self.motorsIPC.snapshotFeedback()
+		if self.lineIPC is not None:
+			self.lineIPC.snapshotFrame()
+		if self.imageIPC is not None:
+			self.imageIPC.snapshotFrame()
+		return self.data
+
+	def getTimestamp(self):
+		return self.data['timestamp'][0]
+
+	def getTick(self):
+		return self.data['tick'][0]
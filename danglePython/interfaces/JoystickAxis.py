@@ -9,7 +9,8 @@ class JoystickAxis(SensorInterface):
 		SensorInterface.__init__(self)
 		self.sensorIPC = sensorIPC
 		self.axis = axis
+		self.channel = sensorIPC.snapshotData[0]['analog'][axis]
 		
 	def getValue(self):
-		return self.sensorIPC.getAnalogValue(self.axis) 
+		return self.channel['value']
 	
\ No newline at end of file
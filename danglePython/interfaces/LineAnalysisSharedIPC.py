@@ -1,8 +1,14 @@
 import numpy as np
+from interfaces.SharedIPC import SharedIPC
 
-class LineAnalysisSharedIPC:
+class LineAnalysisSharedIPC(SharedIPC):
 	# Structure of the line analysis shared memory
-	line_analysis_shared_dt = np.dtype([
+	# Results are double buffered, the producer fills in the inactive bank then flips activebank so readers never see a
+	# mix of two frames
+	MAX_POINTS = 128
+	line_analysis_frame_dt = np.dtype([
+					('sequence',np.uint32),	# Odd whilst the bank is being written
+					('frame',np.uint32),	# Frame number, incremented for each frame published
 					('status', np.uint16),	# 0=no value, 1=valid value
 					('timestamp',np.uint64),
 					('elapsed',np.float32),
@@ -10,59 +16,122 @@ class LineAnalysisSharedIPC:
 					('yaw',np.float32),		# Absolute target at time of image capture
 					('vector',np.float32,(2,2)),
 					('numberpoints',np.uint32),
-					('points',np.float32,(128,2))])
+					('points',np.int16,(MAX_POINTS,2))])	# Pixel coordinates (x, y)
+	line_analysis_shared_dt = np.dtype([
+					('activebank',np.uint16),	# Bank holding the latest complete frame
+					('banks',line_analysis_frame_dt, (2))])
+	shared_dt = line_analysis_shared_dt
 	filename = '/dev/shm/vision_line_shared.mmf'
-	
-	def create(self):
-		try:
-			# Try existing file first
-			self.data  = np.memmap(LineAnalysisSharedIPC.filename, offset=0, dtype=LineAnalysisSharedIPC.line_analysis_shared_dt, mode='r+', shape=(1,1))
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(LineAnalysisSharedIPC.filename, offset=0, dtype=LineAnalysisSharedIPC.line_analysis_shared_dt, mode='w+', shape=(1,1))
-	
-	def read(self):
-		# Read only
-		try:
-			# Try existing file first
-			self.data  = np.memmap(LineAnalysisSharedIPC.filename, offset=0, dtype=LineAnalysisSharedIPC.line_analysis_shared_dt, mode='r')
-		except:
-			# Need to create first
-			self.data  = np.memmap(LineAnalysisSharedIPC.filename, offset=0, dtype=LineAnalysisSharedIPC.line_analysis_shared_dt, mode='w+', shape=(1,1))
+
+	def attachViews(self, data):
+		# Views are indexed by bank
+		self._activebank = data['activebank']
+		self._banks = data['banks'][0]
+		self._sequence = self._banks['sequence']
+		self._frame = self._banks['frame']
+		self._status = self._banks['status']
+		self._timestamp = self._banks['timestamp']
+		self._elapsed = self._banks['elapsed']
+		self._angle = self._banks['angle']
+		self._yaw = self._banks['yaw']
+		self._vector = self._banks['vector']
+		self._numberpoints = self._banks['numberpoints']
+		self._points = self._banks['points']
+		# Latest frame as captured by snapshotFrame(), preallocated so views into it stay valid
+		self.frameSnapshot = np.zeros(1, dtype=LineAnalysisSharedIPC.line_analysis_frame_dt)
 			
 	def shareResults(self, timestamp, elapsed, angle, yaw, vector, points, status = 1):
-		self.data[0]['status'] = status
-		self.data[0]['timestamp'] = timestamp
-		self.data[0]['elapsed'] = elapsed
-		self.data[0]['angle'] = angle
-		self.data[0]['yaw'] = yaw
-		self.data[0]['vector'][0] = vector
-		self.data[0]['numberpoints'] = len(points)
-		for point in range(len(points)):
-			self.data[0]['points'][0][point] = points[point]
+		active = self._activebank[0]
+		bank = 1 - active
+		self._sequence[bank] += 1	# Odd, a slow reader still copying this bank will retry
+		self._frame[bank] = self._frame[active] + 1
+		self._status[bank] = status
+		self._timestamp[bank] = timestamp
+		self._elapsed[bank] = elapsed
+		self._angle[bank] = angle
+		self._yaw[bank] = yaw
+		self._vector[bank] = vector
+		# Any sequence of (x, y) pairs, converted and copied in one go
+		points = np.asarray(points, dtype=np.int16).reshape(-1, 2)[:LineAnalysisSharedIPC.MAX_POINTS]
+		self._numberpoints[bank] = len(points)
+		self._points[bank, :len(points)] = points
+		self._sequence[bank] += 1
+		# Flip, readers now see the new frame
+		self._activebank[0] = bank
+		self.publish()
 			
 	def noResults(self, status = 0):
-		self.data[0]['status'] = status
+		# New frame, otherwise the same as the last
+		active = self._activebank[0]
+		bank = 1 - active
+		sequence = self._sequence[bank] + 1
+		self._sequence[bank] = sequence
+		self._banks[bank] = self._banks[active]
+		self._sequence[bank] = sequence		# Copied over, so still needs to be odd
+		self._frame[bank] += 1
+		self._status[bank] = status
+		self._sequence[bank] = sequence + 1
+		self._activebank[0] = bank
+		self.publish()
+
+	def copyFrame(self, out):
+		# Consistent copy of the latest frame into out, a 1 element array of line_analysis_frame_dt
+		while True:
+			bank = self._activebank[0]
+			sequence = self._sequence[bank]
+			if sequence & 1 == 0:
+				np.copyto(out, self._banks[bank:bank+1])
+				if self._sequence[bank] == sequence:
+					return out
+
+	def readFrame(self):
+		''' Consistent copy of the latest frame, with the fields as in line_analysis_frame_dt
+		'''
+		return self.copyFrame(np.zeros(1, dtype=LineAnalysisSharedIPC.line_analysis_frame_dt))[0]
+
+	def snapshotFrame(self):
+		# Update frameSnapshot, only copying if there is a new frame
+		if self.getFrame() != self.frameSnapshot['frame'][0]:
+			self.copyFrame(self.frameSnapshot)
+		return self.frameSnapshot
+
+	def getFrame(self):
+		# Number of the latest frame, cheap to compare against that from readFrame() to see if anything is new
+		return self._frame[self._activebank[0]]
 
 	def getStatus(self):
-		return self.data[0]['status']
+		return self._status[self._activebank[0]]
 	
 	def getTimestamp(self):
-		return self.data[0]['timestamp']
+		return self._timestamp[self._activebank[0]]
 	
 	def getElapsed(self):
-		return self.data[0]['elapsed'] 
+		return self._elapsed[self._activebank[0]]
 		
 	def getAngle(self):
-		return self.data[0]['angle']
+		return self._angle[self._activebank[0]]
 		
 	def getYaw(self):
-		return self.data[0]['yaw']
+		return self._yaw[self._activebank[0]]
 		
 	def getVector(self):
-		return self.data[0]['vector'][0]
+		return self._vector[self._activebank[0]]
 		
 	def getPoints(self):
-		numpoints = self.data[0]['numberpoints']
-		return self.data[0]['points'][:numpoints]
+		''' Consistent copy of the latest frame's points, as a read-only (n, 2) array.
+			Use readFrame() or frameSnapshot instead where the points need to match the other fields.
+		'''
+		while True:
+			bank = self._activebank[0]
+			sequence = self._sequence[bank]
+			if sequence & 1 == 0:
+				points = self._points[bank, :self._numberpoints[bank]].copy()
+				if self._sequence[bank] == sequence:
+					points.flags.writeable = False
+					return points
+
+	@staticmethod
+	def pointsFromFrame(frame):
+		# The valid points of a frame from readFrame() or frameSnapshot, as a view
+		return frame['points'][:frame['numberpoints']]
 	
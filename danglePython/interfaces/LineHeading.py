@@ -7,13 +7,15 @@ class LineHeading(SensorInterface):
 	def __init__(self, visionIPC):
 		SensorInterface.__init__(self)
 		self.visionIPC = visionIPC
+		# Frame captured by the last snapshot
+		self.frame = visionIPC.frameSnapshot[0]
 		
 	def getValue(self):
-		return self.visionIPC.getYaw()
+		return self.frame['yaw']
 			
 	def getStatus(self):
-		return self.visionIPC.getStatus()
+		return self.frame['status']
 			
 	def getDistance(self):
-		return self.visionIPC.getPoints()[0,1]
+		return self.frame['points'][0,1]
 			
@@ -1,4 +1,40 @@
 import sys, math, numpy
+from interfaces import Futex
+
+# Convert Quaternion to Euler angles (degrees).  These work on a single quaternion (w,x,y,z) or in one pass on the
+# 'quaternion' field of a slice of readings, e.g. rollDegrees(mpu.read_new_samples()['quaternion'])
+def _components(quaternions):
+	q = numpy.asarray(quaternions, dtype=numpy.float64)
+	if q.shape[-1] != 4:
+		q = q[...,0]	# As stored in the shared buffer, (4,1) per reading
+	return q[...,0], q[...,1], q[...,2], q[...,3]
+
+# The formulas are shared by the numpy versions (for arrays of readings) and the math versions (for a single reading),
+# given the atan2 to use
+def _roll(qw, qx, qy, qz, atan2):
+	# roll (x-axis rotation)
+	sinr_cosp = +2.0 * (qw * qx + qy * qz)
+	cosr_cosp = +1.0 - 2.0 * (qx * qx + qy * qy)
+	return atan2(sinr_cosp, cosr_cosp)
+
+def _sinPitch(qw, qx, qy, qz):
+	# pitch (y-axis rotation), before clipping to cope with "gimbol lock", i.e. use 90 degrees if out of range
+	return +2.0 * (qw * qy - qz * qx)
+
+def _yaw(qw, qx, qy, qz, atan2):
+	# yaw (z-axis rotation)
+	siny_cosp = +2.0 * (qw * qz + qx * qy)
+	cosy_cosp = +1.0 - 2.0 * (qy * qy + qz * qz)
+	return atan2(siny_cosp, cosy_cosp)
+
+def rollDegrees(quaternions):
+	return numpy.degrees(_roll(*_components(quaternions), numpy.arctan2))
+
+def pitchDegrees(quaternions):
+	return numpy.degrees(numpy.arcsin(numpy.clip(_sinPitch(*_components(quaternions)), -1.0, 1.0)))
+
+def yawDegrees(quaternions):
+	return numpy.degrees(_yaw(*_components(quaternions), numpy.arctan2))
 
 class MotionSensorSharedIPC:
 	def __init__(self):
@@ -40,6 +76,20 @@ class MotionSensorSharedIPC:
 								('shared_readings_buffer', shared_reading_dt, (1024,1))])
 		#	('shared_readings_buffer', (('timestamp',numpy.uint32),('accel',numpy.float32,(3,1)),('gyro',numpy.float32,(3,1)),('quaternion',numpy.float32,(4,1)),('flags',numpy.int32)),(1,1024))])
 		self.data  = numpy.memmap('/dev/shm/mpu_values_shared.mmf', offset=0, dtype=shared_dt, mode='r')
+		# The generator process wakes any waiters each time it updates sample_number
+		self.sample_number_word = self.data['sample_number']
+		self.seen_sample_number = self.sample_number_word[0]
+		# Flat view of the ring.  Sample number n is written to slot n % buffer_size
+		self.readings = self.data[0]['shared_readings_buffer'][:,0]
+		self.read_cursor = int(self.seen_sample_number)
+
+	def waitForUpdate(self, timeout = None):
+		''' Block until a new sample has been written since the last call, or timeout (seconds) expires.
+			Returns True if there is a new sample, False on timeout.
+		'''
+		seen = self.seen_sample_number
+		self.seen_sample_number = Futex.waitForChange(self.sample_number_word, seen, timeout)
+		return self.seen_sample_number != seen
 
 	def updateReading(self):
 		self.sample_count += 1
@@ -53,10 +103,10 @@ class MotionSensorSharedIPC:
 		self.gx=latest_sample['gyro'][0] # Gyro values
 		self.gy=latest_sample['gyro'][1]
 		self.gz=latest_sample['gyro'][2]
-		self.qw=latest_sample['quaternion'][0] # Quaternium values
-		self.qx=latest_sample['quaternion'][1]
-		self.qy=latest_sample['quaternion'][2]
-		self.qz=latest_sample['quaternion'][3]
+		self.qw=latest_sample['quaternion'][0,0] # Quaternium values
+		self.qx=latest_sample['quaternion'][1,0]
+		self.qy=latest_sample['quaternion'][2,0]
+		self.qz=latest_sample['quaternion'][3,0]
 		self.flags=latest_sample['flags'] # Flags
 		self.orientation = self.data[0]['orientation']
 		self.tap_count = self.data[0]['tap_count']
@@ -67,49 +117,45 @@ class MotionSensorSharedIPC:
 		if self.timeZero == 0:
 			self.timeZero = self.timestamp	# Baseline the time
 
-	def updateBufferedReadings(self):
-		# Simply take a copy of the readings
-		latest = self.data[0]['latest_sample']
-		oldest = self.data[0]['oldest_sample']
-		tmp_readings_buffer = self.data[0]['shared_readings_buffer']
-		if latest > oldest:
-			# simple split
-			self.readings_buffer = tmp_readings_buffer[oldest:latest]
+	def samplesEndingAt(self, sample_number, count):
+		# The count samples up to and including sample_number, as a view if they don't wrap, otherwise one concatenated copy
+		# The slot after the latest may be being written, so at most buffer_size-1 are available
+		count = min(count, len(self.readings) - 1)
+		end = sample_number % len(self.readings) + 1
+		start = end - count
+		if start >= 0:
+			return self.readings[start:end]
 		else:
-			if latest == 0:
-				# simple split
-				self.readings_buffer = tmp_readings_buffer[1::oldest]
-			else:
-				self.readings_buffer = numpy.concatenate((tmp_readings_buffer[oldest:], tmp_readings_buffer[0:latest-1]))
+			return numpy.concatenate((self.readings[start:], self.readings[:end]))
+
+	def read_new_samples(self):
+		''' Samples written since the previous call (or since opening, for the first call), oldest first.
+			If the reader has fallen more than a buffer behind, only the most recent buffer's worth are returned.
+		'''
+		sample_number = int(self.sample_number_word[0])
+		count = sample_number - self.read_cursor
+		if count < 0:
+			# Generator process restarted
+			count = sample_number
+		self.read_cursor = sample_number
+		return self.samplesEndingAt(sample_number, count)
+
+	def updateBufferedReadings(self):
+		# All the samples currently held in the buffer
+		sample_number = int(self.sample_number_word[0])
+		self.readings_buffer = self.samplesEndingAt(sample_number, sample_number)
 	
 	# Convert Quaternion to Euler angles helpers
+	# Single reading, so plain floats and math are much quicker than numpy
 	def getRollDegrees(self):
-		# roll (x-axis rotation)
-		sinr_cosp = +2.0 * (self.qw * self.qx + self.qy * self.qz)
-		cosr_cosp = +1.0 - 2.0 * (self.qx * self.qx + self.qy * self.qy)
-		return math.atan2(sinr_cosp, cosr_cosp) * 180.0/numpy.pi
-
-#	def getPitchDegrees(self):
-#		# pitch (y-axis rotation)
-#		sinr_cosp = +2.0 * (self.qw * self.qy + self.qx * self.qz)
-#		cosr_cosp = +1.0 - 2.0 * (self.qy * self.qy + self.qx * self.qx)
-#		return math.atan2(sinr_cosp, cosr_cosp) * 180.0/numpy.pi
-
+		return math.degrees(_roll(float(self.qw), float(self.qx), float(self.qy), float(self.qz), math.atan2))
 
 	def getPitchDegrees(self):
-		# This is to cope with "gimbol lock"
-		# pitch (y-axis rotation)
-		sinp = +2.0 * (self.qw * self.qy - self.qz * self.qx)
-		if (math.fabs(sinp) >= 1) :
-			return math.copysign(numpy.pi / 2, sinp) * 180.0/numpy.pi # use 90 degrees if out of range
-		else :
-			return math.asin(sinp) * 180.0/numpy.pi
+		sinp = _sinPitch(float(self.qw), float(self.qx), float(self.qy), float(self.qz))
+		return math.degrees(math.asin(min(1.0, max(-1.0, sinp))))
 
 	def getYawDegrees(self):
-		# yaw (z-axis rotation)
-		siny_cosp = +2.0 * (self.qw * self.qz + self.qx * self.qy)
-		cosy_cosp = +1.0 - 2.0 * (self.qy * self.qy + self.qz * self.qz)
-		return math.atan2(siny_cosp, cosy_cosp) * 180.0/numpy.pi
+		return math.degrees(_yaw(float(self.qw), float(self.qx), float(self.qy), float(self.qz), math.atan2))
 
 	def get_quaternion(self):
 		return (self.qw, self.qx, self.qy, self.qz)
@@ -136,15 +182,7 @@ class MotionSensorSharedIPC:
 		return float(self.get_timestampMs()) / 1000.0
 	
 	def get_pitchBufferedReadingsDegrees(self,sample_interval=1):
-		out = []
-		for reading in self.readings_buffer[::sample_interval]:
-			 # Get the Quaternium values as "current"
-			self.qw=reading[0]['quaternion'][0]
-			self.qx=reading[0]['quaternion'][1]
-			self.qy=reading[0]['quaternion'][2]
-			self.qz=reading[0]['quaternion'][3]
-			out.append(self.getPitchDegrees())
-		return out
+		return pitchDegrees(self.readings_buffer['quaternion'][::sample_interval])
 		
 	def get_compassDegrees(self):
 		return math.atan2(float(self.my), float(self.mx)) * 180.0/numpy.pi
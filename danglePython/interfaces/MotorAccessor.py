@@ -12,6 +12,7 @@ class MotorAccessor(ControlInterface):
 	def setValue(self, value):
 		#print(f"MotorAccessor[{self.motor}]: {value}")
 		self.motorsIPC.setRequiredTorque(self.motor, value)
+		self.motorsIPC.pushSetpoint(self.motor, value)
 
 	def getValue(self):
 		return self.motorsIPC.getRequiredTorque(self.motor)
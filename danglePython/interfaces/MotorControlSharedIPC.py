@@ -1,76 +1,114 @@
+import time
 import numpy as np
+from interfaces.SharedIPC import SharedIPC
 
-class MotorControlSharedIPC:
+class MotorControlSharedIPC(SharedIPC):
 	''' Share memory structure to reconrol the motor drivers.
 		For speed and torgue: 1.0 = max forward, -1.0 = max backwards
 		For position, it is a 64-bit pulse counter from nominal start position, i.e. depends on motors, wheel size etc.
-		Watchdog will be decremented on each control loop and if reaches zero, the motors will be stopped.  Set to 100 for 1 second protection.
+		If the controller's heartbeat is more than a second old, the motors will be stopped.
+		As well as the latest required value, the controller pushes each one onto a short per-motor trajectory of
+		(time, value) points, timed slightly ahead.  The motor process interpolates along it at its own rate, so jitter in
+		either loop doesn't turn into steps in the output.
 	'''
-	motor_dt = np.dtype([
-					('name', np.unicode_, (32)),
+	TRAJECTORY = 16			# Points per motor
+	SETPOINT_LEAD = 0.02	# Default seconds ahead for pushSetpoint(), at least one controller tick
+	setpoint_dt = np.dtype([
+					('time',np.float64),	# time.monotonic() to reach value at
+					('value',np.float32)], align=True)
+	# Regions are split by which process writes them, each on its own cache lines
+	motor_command_dt = np.dtype([	# Written by the controller
 					('mode',np.uint16),		#0 = Off, 1 = Torque controlled, 2 = Speed controlled, 3 = Position controlled
 					('reqtorque',np.float32),
-					('acttorque',np.float32),
 					('reqspeed',np.float32),
-					('actspeed',np.float32),
 					('reqposistion',np.int64),
-					('actposistion',np.int64)])
-	motors_shared_dt = np.dtype([
-					('watchdog',np.uint16),
-					('motors',motor_dt, (8))])
+					('setpointhead',np.uint32),	# Number of points ever pushed, point n is in slot n % TRAJECTORY
+					('setpoints',setpoint_dt, (TRAJECTORY))], align=True)
+	motor_feedback_dt = np.dtype([	# Written by the motor process
+					('acttorque',np.float32),
+					('actspeed',np.float32),
+					('actposistion',np.int64)], align=True)
+	motors_shared_dt = SharedIPC.cacheAligned([
+					('command',motor_command_dt, (8)),
+					('feedback',motor_feedback_dt, (8)),
+					('heartbeat',np.float64),
+					('name',np.dtype('U32'), (8))])	# Rarely used
+	shared_dt = motors_shared_dt
 	filename = '/dev/shm/motor_control_shared.mmf'
-	
-	def create(self):
-		try:
-			self.open()
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(MotorControlSharedIPC.filename, offset=0, dtype=MotorControlSharedIPC.motors_shared_dt, mode='w+', shape=(1))
-	
-	def open(self):
-		# Read/write (no create)
-		self.data  = np.memmap(MotorControlSharedIPC.filename, offset=0, dtype=MotorControlSharedIPC.motors_shared_dt, mode='r+')
+
+	def attachViews(self, data):
+		command = data['command'][0]
+		feedback = data['feedback'][0]
+		self._name = data['name'][0]
+		self._mode = command['mode']
+		self._reqtorque = command['reqtorque']
+		self._reqspeed = command['reqspeed']
+		self._reqposition = command['reqposistion']
+		self._setpointhead = command['setpointhead']
+		self._setpoints = command['setpoints']
+		self._acttorque = feedback['acttorque']
+		self._actspeed = feedback['actspeed']
+		self._actposition = feedback['actposistion']
+		self._feedback = feedback
+		# Feedback as captured by snapshotFeedback(), preallocated so views into it stay valid
+		self.feedbackSnapshot = np.zeros(len(feedback), dtype=MotorControlSharedIPC.motor_feedback_dt)
 
 	def setName(self, motor, name):
-		self.data[0]['motors'][motor]['name'] = name
+		self._name[motor] = name
 	def setRequiredTorque(self, motor, value):
-		self.data[0]['motors'][motor]['reqtorque'] = value
+		self._reqtorque[motor] = value
 	def getRequiredTorque(self, motor):
-		return self.data[0]['motors'][motor]['reqtorque'].copy()
+		return self._reqtorque[motor]
 	def setRequiredSpeed(self, motor, value):
-		self.data[0]['motors'][motor]['reqspeed'] = value
+		self._reqspeed[motor] = value
 	def getRequiredSpeed(self, motor):
-		return self.data[0]['motors'][motor]['reqspeed'].copy()
+		return self._reqspeed[motor]
 	def setRequiredPosition(self, motor, value):
-		self.data[0]['motors'][motor]['reqposistion'] = value
+		self._reqposition[motor] = value
 	def getRequiredPosition(self, motor):
-		return self.data[0]['motors'][motor]['reqposistion'].copy()
-	
+		return self._reqposition[motor]
+
+	def pushSetpoint(self, motor, value, at = None):
+		# Add a point to the motor's trajectory, to be reached at time at (time.monotonic()), by default SETPOINT_LEAD from now
+		head = self._setpointhead[motor] + 1
+		self._setpoints[motor, head % MotorControlSharedIPC.TRAJECTORY] = (time.monotonic() + MotorControlSharedIPC.SETPOINT_LEAD if at is None else at, value)
+		self._setpointhead[motor] = head
+	def getSetpoint(self, motor, now = None):
+		''' Required value interpolated along the trajectory at now (time.monotonic()), holding the first or last point outside
+			of it.  Falls back to the required torque until a point has been pushed.
+		'''
+		now = time.monotonic() if now is None else now
+		while True:
+			head = int(self._setpointhead[motor])
+			if head == 0:
+				return self._reqtorque[motor]
+			# Leave out the oldest slot, the next to be written
+			count = min(head, MotorControlSharedIPC.TRAJECTORY - 1)
+			points = self._setpoints[motor, np.arange(head - count + 1, head + 1) % MotorControlSharedIPC.TRAJECTORY]
+			# Retry if the controller got more than a point further on whilst copying
+			if self._setpointhead[motor] - head <= 1:
+				return np.interp(now, points['time'], points['value'])
+
+	def snapshotFeedback(self):
+		# The feedback region is written by one process, a single copy is enough
+		np.copyto(self.feedbackSnapshot, self._feedback)
+		return self.feedbackSnapshot
+
 	def getName(self, motor):
-		return self.data[0]['motors'][motor]['name'].copy()
+		return self._name[motor]
 	def setCurrentTorque(self, motor, value):
-		self.data[0]['motors'][motor]['acttorque'] = value
+		self._acttorque[motor] = value
 	def getCurrentTorque(self, motor):
-		return self.data[0]['motors'][motor]['acttorque'].copy()
+		return self._acttorque[motor]
 	def setCurrentSpeed(self, motor, value):
-		self.data[0]['motors'][motor]['actspeed'] = value
+		self._actspeed[motor] = value
 	def getCurrentSpeed(self, motor):
-		return self.data[0]['motors'][motor]['actspeed'].copy()
+		return self._actspeed[motor]
 	def setCurrentPosition(self, motor, value):
-		self.data[0]['motors'][motor]['actposistion'] = value
+		self._actposition[motor] = value
 	def getCurrentPosition(self, motor):
-		return self.data[0]['motors'][motor]['actposistion'].copy()
+		return self._actposition[motor]
 	def setMode(self, motor, mode):
-		self.data[0]['motors'][motor]['mode'] = mode
+		self._mode[motor] = mode
 	def getMode(self, motor):
-		return self.data[0]['motors'][motor]['mode'].copy()
-		
-	def checkWatchdog(self):
-		if self.data[0]['watchdog'] > 0:
-			# countdown
-			self.data[0]['watchdog'] -= 1
-		return self.data[0]['watchdog']
-	def resetWatchdog(self, count = 100):
-		self.data[0]['watchdog'] = count
-		
-
+		return self._mode[motor]
@@ -8,6 +8,7 @@ class MotorPosition(ControlInterface):
 		ControlInterface.__init__(self)
 		self.motorsIPC = motorsIPC
 		self.motor = motor
+		self.feedback = motorsIPC.feedbackSnapshot[motor]
 		
 	def setValue(self, value):
 		#print(f"MotorControl[{self.motor}]: {value}")
@@ -15,5 +16,5 @@ class MotorPosition(ControlInterface):
 
 	def getValue(self):
 		#print(f"MotorPosition[{self.motor}]: {self.motorsIPC.getCurrentPosition(self.motor)}")
-		return self.motorsIPC.getCurrentPosition(self.motor)
+		return self.feedback['actposistion']
 	
@@ -8,11 +8,12 @@ class MotorSpeed(ControlInterface):
 		ControlInterface.__init__(self)
 		self.motorsIPC = motorsIPC
 		self.motor = motor
+		self.feedback = motorsIPC.feedbackSnapshot[motor]
 		
 	def setValue(self, value):
 		print(f"MotorControl[{self.motor}]: {value}")
 		self.motorsIPC.setRequiredSpeed(self.motor, value)
 
 	def getValue(self):
-		return self.motorsIPC.getCurrentSpeed(self.motor)
+		return self.feedback['actspeed']
 	
@@ -0,0 +1,174 @@
+import fcntl
+import numpy as np
+from interfaces.SharedIPC import SharedIPC
+
+class ParameterSharedIPC(SharedIPC):
+	''' Live values of the tunable parameters from config.json, e.g. PID gains, thresholds and speeds.
+		Config seeds each parameter the first time any process asks for it, after which the value here is the one used, so it
+		can be changed on the fly (see ParameterTool.py) without restarting.  Every change publish()es, so processes can
+		check getGeneration() once a tick and only re-read their parameters when it has moved on.
+		The hash of the config.json they were seeded from is kept too.  If the file has since been edited, the first Config
+		created in a process reseeds everything from it, so editing the file and restarting works as it always did.
+		Numbers, booleans and short lists of numbers are supported, anything else stays in config.json only.
+	'''
+	PARAMETERS = 256
+	VALUES = 8		# Longest list
+	# Types
+	FLOAT = 1
+	INT = 2
+	BOOL = 3
+	FLOAT_LIST = 4
+	INT_LIST = 5
+	parameter_dt = np.dtype([
+					('sequence', np.uint32),	# Seqlock counter, odd whilst an update is in progress
+					('type', np.uint8),
+					('count', np.uint8),		# Number of values
+					('name', np.dtype('U48')),
+					('values', np.float64, (VALUES))])
+	parameters_shared_dt = np.dtype([
+					('sourcehash', np.uint32),		# crc32 of the config file seeded from
+					('numberparameters', np.uint16),
+					('parameters', parameter_dt, (PARAMETERS))])
+	shared_dt = parameters_shared_dt
+	filename = '/dev/shm/parameters_shared.mmf'
+
+	def attachViews(self, data):
+		self._sourcehash = data['sourcehash']
+		self._numberparameters = data['numberparameters']
+		self._parameters = data['parameters'][0]
+		self._sequence = self._parameters['sequence']
+		self._names = self._parameters['name']
+		self._slots = {}
+
+	def lock(self):
+		# Exclusive lock on the segment for adding or changing parameters, released when the returned file is closed
+		f = open(self.filename)
+		fcntl.flock(f, fcntl.LOCK_EX)
+		return f
+
+	@staticmethod
+	def encode(value):
+		# (type, values) for a supported value, else None
+		if isinstance(value, bool):
+			return ParameterSharedIPC.BOOL, [value]
+		if isinstance(value, int):
+			return ParameterSharedIPC.INT, [value]
+		if isinstance(value, float):
+			return ParameterSharedIPC.FLOAT, [value]
+		if isinstance(value, (list, tuple)) and 0 < len(value) <= ParameterSharedIPC.VALUES and \
+				all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+			return ParameterSharedIPC.INT_LIST if all(isinstance(v, int) for v in value) else ParameterSharedIPC.FLOAT_LIST, list(value)
+		return None
+
+	@staticmethod
+	def decode(type, values):
+		if type == ParameterSharedIPC.FLOAT:
+			return float(values[0])
+		if type == ParameterSharedIPC.INT:
+			return int(values[0])
+		if type == ParameterSharedIPC.BOOL:
+			return bool(values[0])
+		if type == ParameterSharedIPC.INT_LIST:
+			return [int(v) for v in values]
+		return [float(v) for v in values]
+
+	def find(self, name):
+		# Slot of the named parameter, or None
+		slot = self._slots.get(name)
+		if slot is None and len(self._slots) != self._numberparameters[0]:
+			# Pick up any added by other processes
+			self._slots = {str(string): slot for slot, string in enumerate(self._names[:self._numberparameters[0]])}
+			slot = self._slots.get(name)
+		return slot
+
+	def _write(self, slot, encoded):
+		type, values = encoded
+		parameter = self._parameters[slot]
+		self._sequence[slot] += 1	# Now odd, readers will retry
+		parameter['type'] = type
+		parameter['count'] = len(values)
+		parameter['values'][:len(values)] = values
+		self._sequence[slot] += 1
+
+	def _add(self, name, encoded):
+		slot = self._numberparameters[0]
+		if slot >= ParameterSharedIPC.PARAMETERS:
+			print(f"ParameterSharedIPC: no room for '{name}'")
+			return None
+		self._names[slot] = name
+		self._write(slot, encoded)
+		self._numberparameters[0] = slot + 1
+		self._slots[name] = slot
+		return slot
+
+	def seed(self, name, value):
+		''' Live value of the named parameter, first adding it with value if it doesn't exist yet.
+			Values that can't be held here are returned unchanged.
+		'''
+		encoded = ParameterSharedIPC.encode(value)
+		if encoded is None:
+			return value
+		slot = self.find(name)
+		if slot is None:
+			with self.lock():
+				slot = self.find(name)
+				if slot is None:
+					# Nobody is using it yet, so no need to publish()
+					self._add(name, encoded)
+					return value
+		return self.getValue(slot)
+
+	def set(self, name, value):
+		# Change (or add) the named parameter.  Returns False if the value isn't supported.
+		encoded = ParameterSharedIPC.encode(value)
+		if encoded is None:
+			return False
+		with self.lock():
+			slot = self.find(name)
+			if slot is None:
+				self._add(name, encoded)
+			else:
+				self._write(slot, encoded)
+			self.publish()
+		return True
+
+	def reseed(self, values, sourceHash):
+		''' Reset the live values to values (a dict, as read from the config file) if they were seeded from a different version
+			of the file, identified by sourceHash.  Returns True if they were.
+		'''
+		with self.lock():
+			if self._sourcehash[0] == sourceHash:
+				return False
+			for name, value in values.items():
+				encoded = ParameterSharedIPC.encode(value)
+				if encoded is not None:
+					slot = self.find(name)
+					if slot is None:
+						self._add(name, encoded)
+					else:
+						self._write(slot, encoded)
+			self._sourcehash[0] = sourceHash
+			self.publish()
+		return True
+
+	def setSourceHash(self, sourceHash):
+		# The file now matches the live values, e.g. after saving it
+		self._sourcehash[0] = sourceHash
+
+	def getValue(self, slot):
+		# Consistent copy of the parameter in slot, as a Python value
+		parameter = self._parameters[slot]
+		while True:
+			sequence = self._sequence[slot]
+			if sequence & 1 == 0:
+				copied = parameter.copy()
+				if self._sequence[slot] == sequence:
+					return ParameterSharedIPC.decode(copied['type'], copied['values'][:copied['count']])
+
+	def get(self, name, default = None):
+		slot = self.find(name)
+		return default if slot is None else self.getValue(slot)
+
+	def getAll(self):
+		# Name to value for every parameter
+		return {str(self._names[slot]): self.getValue(slot) for slot in range(self._numberparameters[0])}
@@ -10,6 +10,7 @@ from interfaces.SensorsSharedIPC import SensorsSharedIPC
 from interfaces.CounterSensor import CounterSensor
 from interfaces.CounterChangeSensor import CounterChangeSensor
 from interfaces.AnalogSensor import AnalogSensor
+from interfaces.IpcBus import IpcBus
 
 class SensorAccessFactory:
 
@@ -18,6 +19,10 @@ class SensorAccessFactory:
 		self.mpu = MotionSensorSharedIPC()
 		self.sensorsIPC = SensorsSharedIPC()
 		self.sensorsIPC.create()
+		self.bus = IpcBus.getSingleton()
+		self.bus.attachMpu(self.mpu)
+		self.bus.attachSensors(self.sensorsIPC)
+		self.bus.snapshot()
 
 	__instance = None
 	@classmethod
@@ -31,10 +36,15 @@ class SensorAccessFactory:
 		#for event in pygame.event.get():
 		#	# Processes necessary events to update current joystick state
 		#	pass
-		self.mpu.updateReading()
+		# Capture all the attached segments together, accessors read from this snapshot until the next tick
+		self.bus.snapshot()
 
-	def resetWatchdog(self, count = 100):
-		self.sensorsIPC.resetWatchdog(count)
+	def waitForUpdate(self, timeout = None):
+		# Block until the MPU has a new sample, rather than polling
+		return self.mpu.waitForUpdate(timeout)
+
+	def resetWatchdog(self, alive = True):
+		self.sensorsIPC.resetWatchdog(alive)
 
 	def checkWatchdog(self):
 		return self.sensorsIPC.checkWatchdog()
@@ -60,6 +70,7 @@ class SensorAccessFactory:
 	####################################################################
 	# Factory methods to access the sensor interfacte
 	# These are the primary methods used to access the sensor IPC values
+	# Values are those captured by the last call to process()
 	def joystickAxis(self, axis):
 		return JoystickAxis(self.sensorsIPC, axis)
 	def button(self, button):
@@ -1,6 +1,7 @@
 import numpy as np
+from interfaces.SharedIPC import SharedIPC
 
-class SensorsSharedIPC:
+class SensorsSharedIPC(SharedIPC):
 	''' Shared memory structure to return simple sensor data.
 		Three types of sensors are currently supported:
 			Analog - These include Distance sensors, ADCs and Joystick axes.  Where a finite range is produced, 
@@ -10,96 +11,205 @@ class SensorsSharedIPC:
 			Counters - These are integer-based, and generally increase or decrease in response to external stimuli, such 
 			as quadature encoders.  It also returns a rate-of-change in counts/second (note: only really valid for rapid 
 			changing sensors)
-		Watchdog should be decremented on each read in any control loop and if reaches zero, the sensor values should be treated as 
-		unreliable (probably crashed) and set motors etc. into safe mode.  Set to 100 for 1 second protection.
+		Sensor processes stamp the heartbeat while alive.  If it is more than a second old, the sensor values should be treated
+		as unreliable (probably crashed) and set motors etc. into safe mode.
+		Each channel carries a sequence counter (seqlock).  The single writer of a channel makes it odd before updating the 
+		fields and even again afterwards, so readers can detect and retry a torn read without taking any lock.
+		Analog and counter channels also keep a ring of their last HISTORY_SIZE valid samples, so filters can work over every
+		sample a sensor process wrote rather than just the latest.  Each sample is stored twice, HISTORY_SIZE entries apart, 
+		so the most recent n samples are always one contiguous slice and can be returned as a view without copying.
+		The structures are aligned (align=True), so the sequence counters and other fields are naturally aligned.
 	'''
+	HISTORY_SIZE = 64
 	sensor_analog_dt = np.dtype([
+					('sequence', np.uint32),	# Seqlock counter, odd whilst an update is in progress
 					('status', np.uint16),	# 0=no value, 1=valid value
 					('timestamp', np.float64 ),
-					('value', np.float32)])
+					('value', np.float32),
+					('samples', np.uint32)], align=True)	# Number of samples added to the history
 	sensor_digital_dt = np.dtype([
+					('sequence', np.uint32),
 					('status', np.uint16),	# 0=no value, 1=valid value
 					('timestamp', np.float64 ),
-					('value', np.int16)])
+					('value', np.int16)], align=True)
 	sensor_counter_dt = np.dtype([
+					('sequence', np.uint32),
 					('status', np.uint16),	# 0=no value, 1=valid value
 					('timestamp', np.float64 ),
 					('value', np.int64),
-					('rateOfChange', np.float32)])
-	servos_shared_dt = np.dtype([
-					('watchdog', np.uint16),
+					('rateOfChange', np.float32),
+					('samples', np.uint32)], align=True)	# Number of samples added to the history
+	sensor_analog_history_dt = np.dtype([
+					('timestamp', np.float64 ),
+					('value', np.float32)], align=True)
+	sensor_counter_history_dt = np.dtype([
+					('timestamp', np.float64 ),
+					('value', np.int64)])
+	# Latest values of all channels, as copied by snapshot()
+	sensors_channels_dt = np.dtype([
+					('heartbeat', np.float64),
 					('analog', sensor_analog_dt, (32)),
 					('digital', sensor_digital_dt, (32)),
-					('counter', sensor_counter_dt, (32))])
+					('counter', sensor_counter_dt, (32))], align=True)
+	# Built from the channel fields rather than .descr, which would turn the alignment padding into extra fields
+	servos_shared_dt = np.dtype(list(zip(sensors_channels_dt.names, map(sensors_channels_dt.__getitem__, sensors_channels_dt.names))) + [
+					('analogHistory', sensor_analog_history_dt, (32, 2*HISTORY_SIZE)),
+					('counterHistory', sensor_counter_history_dt, (32, 2*HISTORY_SIZE))], align=True)
+	shared_dt = servos_shared_dt
 	filename = '/dev/shm/sensors_shared.mmf'
 	
-	def create(self):
-		try:
-			# Try existing file first
-			self.data  = np.memmap(SensorsSharedIPC.filename, offset=0, dtype=SensorsSharedIPC.servos_shared_dt, mode='r+', shape=(1))
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(SensorsSharedIPC.filename, offset=0, dtype=SensorsSharedIPC.servos_shared_dt, mode='w+', shape=(1))
-	
 	def open(self):
 		# Read only
-		try:
-			# Try existing file first
-			self.data  = np.memmap(SensorsSharedIPC.filename, offset=0, dtype=SensorsSharedIPC.servos_shared_dt, mode='r')
-		except:
-			# Need to create first
-			self.data  = np.memmap(SensorsSharedIPC.filename, offset=0, dtype=SensorsSharedIPC.servos_shared_dt, mode='w+', shape=(1))
+		self.read()
+
+	def attachViews(self, data):
+		self._channels = {block: data[block][0] for block in ('analog', 'digital', 'counter')}
+		self._analog = self._channels['analog']
+		self._digital = self._channels['digital']
+		self._counter = self._channels['counter']
+		# Flat views of each field, so a single field can be read under the seqlock without copying the whole channel
+		self._analogFields = {name: self._analog[name] for name in self._analog.dtype.names}
+		self._digitalFields = {name: self._digital[name] for name in self._digital.dtype.names}
+		self._counterFields = {name: self._counter[name] for name in self._counter.dtype.names}
+		self._analogHistory = data['analogHistory'][0]
+		self._counterHistory = data['counterHistory'][0]
+		# The channels lead the segment, so can be viewed (and copied) on their own
+		self._channelsView = np.ndarray((1), dtype=SensorsSharedIPC.sensors_channels_dt, buffer=data)
+		self.snapshotData = np.zeros(1, dtype=SensorsSharedIPC.sensors_channels_dt)
+
+	def snapshot(self):
+		''' Copy all channels into the local snapshotData array in one go.
+			The array is preallocated and updated in place, so views into it remain valid across snapshots.
+		'''
+		np.copyto(self.snapshotData, self._channelsView)
+		# Re-read any channel a writer was part way through updating during the bulk copy
+		for block, channels in self._channels.items():
+			copied = self.snapshotData[block][0]
+			sequence = copied['sequence']
+			for sensor in np.flatnonzero((sequence & 1) | (sequence != channels['sequence'])):
+				copied[sensor] = self._readChannel(channels, sensor)
+		return self.snapshotData
+
+	# Seqlock helpers
+	def _beginUpdate(self, channel):
+		channel['sequence'] += 1	# Now odd, readers will retry
+	def _endUpdate(self, channel):
+		channel['sequence'] += 1	# Even again, update complete
+	def _readChannel(self, channels, sensor):
+		# Take a consistent copy of a channel, retrying if a writer was part way through an update
+		channel = channels[sensor]
+		while True:
+			sequence = channel['sequence']
+			if sequence & 1 == 0:
+				reading = channel.copy()
+				if channel['sequence'] == sequence:
+					return reading
+	def _readField(self, fields, field, sensor):
+		# As _readChannel, for just the one field
+		sequences = fields['sequence']
+		values = fields[field]
+		while True:
+			sequence = sequences[sensor]
+			if sequence & 1 == 0:
+				value = values[sensor]
+				if sequences[sensor] == sequence:
+					return value
+
+	# History helpers
+	def _addHistory(self, history, channel, value, timestamp):
+		head = channel['samples'] % SensorsSharedIPC.HISTORY_SIZE
+		history[head] = (timestamp, value)
+		history[head + SensorsSharedIPC.HISTORY_SIZE] = (timestamp, value)
+		channel['samples'] += 1
+	def _getHistory(self, history, samples, n):
+		# Latest n samples, oldest first, as a view of the ring
+		samples = int(samples)
+		n = min(n, samples, SensorsSharedIPC.HISTORY_SIZE)
+		end = (samples - 1) % SensorsSharedIPC.HISTORY_SIZE + SensorsSharedIPC.HISTORY_SIZE + 1
+		return history[end - n:end]
 
-	def checkWatchdog(self):
-		if self.data[0]['watchdog'] > 0:
-			# countdown
-			self.data[0]['watchdog'] -= 1
-		return self.data[0]['watchdog']
-	def resetWatchdog(self, count = 100):
-		self.data[0]['watchdog'] = count
-		
 	def setAnalogValue(self, sensor, value, status=1, timestamp = 0):
-		self.data[0]['analog'][sensor]['value'] = value
-		self.data[0]['analog'][sensor]['status'] = status
-		self.data[0]['analog'][sensor]['timestamp'] = timestamp
+		channel = self._analog[sensor]
+		self._beginUpdate(channel)
+		channel['value'] = value
+		channel['status'] = status
+		channel['timestamp'] = timestamp
+		if status != 0:
+			self._addHistory(self._analogHistory[sensor], channel, value, timestamp)
+		self._endUpdate(channel)
+		self.publish()
+	def getAnalogReading(self, sensor):
+		# Consistent value, status and timestamp for the channel
+		return self._readChannel(self._analog, sensor)
 	def getAnalogValue(self, sensor):
-		return self.data[0]['analog'][sensor]['value'].copy()
+		return self._readField(self._analogFields, 'value', sensor)
 	def getAnalogStatus(self, sensor):
-		return self.data[0]['analog'][sensor]['status'].copy()
+		return self._readField(self._analogFields, 'status', sensor)
 	def getAnalogTimestamp(self, sensor):
-		return self.data[0]['analog'][sensor]['timestamp'].copy()
+		return self._readField(self._analogFields, 'timestamp', sensor)
+	def getAnalogHistory(self, sensor, n = HISTORY_SIZE, samples = None):
+		''' Up to the last n valid samples (timestamp and value), oldest first.
+			This is a view onto the shared ring, so copy it if it needs to outlive the next HISTORY_SIZE-n updates.
+			Pass samples (e.g. from a snapshot) to get the history up to that point rather than the latest.
+		'''
+		if samples is None:
+			samples = self._analog[sensor]['samples']
+		return self._getHistory(self._analogHistory[sensor], samples, n)
 
 	def setDigitalValue(self, sensor, value, status=1, timestamp = 0):
-		self.data[0]['digital'][sensor]['value'] = value
-		self.data[0]['digital'][sensor]['status'] = status
-		self.data[0]['digital'][sensor]['timestamp'] = timestamp
+		channel = self._digital[sensor]
+		self._beginUpdate(channel)
+		channel['value'] = value
+		channel['status'] = status
+		channel['timestamp'] = timestamp
+		self._endUpdate(channel)
+		self.publish()
+	def getDigitalReading(self, sensor):
+		return self._readChannel(self._digital, sensor)
 	def getDigitalValue(self, sensor):
-		return self.data[0]['digital'][sensor]['value'].copy()
+		return self._readField(self._digitalFields, 'value', sensor)
 	def getDigitalStatus(self, sensor):
-		return self.data[0]['digital'][sensor]['status'].copy()
+		return self._readField(self._digitalFields, 'status', sensor)
 	def getDigitalTimestamp(self, sensor):
-		return self.data[0]['digital'][sensor]['timestamp'].copy()
+		return self._readField(self._digitalFields, 'timestamp', sensor)
 		
 	def setCounterValue(self, sensor, value, status=1, timestamp = 0):
+		channel = self._counter[sensor]
 		# Work out rate of change
 		if timestamp == 0:
 			# No timestamps
-			self.data[0]['counter'][sensor]['value'] = value
-			self.data[0]['counter'][sensor]['status'] = status
-			self.data[0]['counter'][sensor]['timestamp'] = 0
-			self.data[0]['counter'][sensor]['rateOfChange'] = 0
-		elif timestamp != self.data[0]['counter'][sensor]['timestamp']:
-			self.data[0]['counter'][sensor]['rateOfChange'] = (value-self.data[0]['counter'][sensor]['value']) / (timestamp - self.data[0]['counter'][sensor]['timestamp'])
-			self.data[0]['counter'][sensor]['value'] = value
-			self.data[0]['counter'][sensor]['status'] = status
-			self.data[0]['counter'][sensor]['timestamp'] = timestamp
+			self._beginUpdate(channel)
+			channel['value'] = value
+			channel['status'] = status
+			channel['timestamp'] = 0
+			channel['rateOfChange'] = 0
+			if status != 0:
+				self._addHistory(self._counterHistory[sensor], channel, value, timestamp)
+			self._endUpdate(channel)
+			self.publish()
+		elif timestamp != channel['timestamp']:
+			self._beginUpdate(channel)
+			channel['rateOfChange'] = (value - channel['value']) / (timestamp - channel['timestamp'])
+			channel['value'] = value
+			channel['status'] = status
+			channel['timestamp'] = timestamp
+			if status != 0:
+				self._addHistory(self._counterHistory[sensor], channel, value, timestamp)
+			self._endUpdate(channel)
+			self.publish()
+	def getCounterReading(self, sensor):
+		# Consistent value, rate of change, status and timestamp for the channel
+		return self._readChannel(self._counter, sensor)
 	def getCounterValue(self, sensor):
-		return self.data[0]['counter'][sensor]['value'].copy()
+		return self._readField(self._counterFields, 'value', sensor)
 	def getCounterStatus(self, sensor):
-		return self.data[0]['counter'][sensor]['status'].copy()
+		return self._readField(self._counterFields, 'status', sensor)
 	def getCounterTimestamp(self, sensor):
-		return self.data[0]['counter'][sensor]['timestamp'].copy()
+		return self._readField(self._counterFields, 'timestamp', sensor)
 	def getCounterRateOfChange(self, sensor):
-		return self.data[0]['counter'][sensor]['rateOfChange'].copy()
-		
-		
+		return self._readField(self._counterFields, 'rateOfChange', sensor)
+	def getCounterHistory(self, sensor, n = HISTORY_SIZE, samples = None):
+		# As getAnalogHistory
+		if samples is None:
+			samples = self._counter[sensor]['samples']
+		return self._getHistory(self._counterHistory[sensor], samples, n)
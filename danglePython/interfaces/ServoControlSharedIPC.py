@@ -1,43 +1,49 @@
 import numpy as np
+from interfaces.SharedIPC import SharedIPC
 
-class ServoControlSharedIPC:
+class ServoControlSharedIPC(SharedIPC):
 	''' Shared memory structure to control the servo drivers.
 		Servo positions are defined as: -1.0 extreme anticlockwise, +1.0 extreme clockwise
-		Watchdog will be decremented on each control loop and if reaches zero, the motors will be stopped.  Set to 100 for 1 second protection.
+		If the controller's heartbeat is more than a second old, the motors will be stopped.
+		Writers bump the bank generation whenever a servo actually changes, so the servo process can check it each cycle and
+		only read the servos, all in one go with get_all(), when something has changed.
 	'''
 	servo_dt = np.dtype([
 					('status', np.uint16),	# 0=off, 1=driven
 					('position', np.float32)])
-	servos_shared_dt = np.dtype([
-					('watchdog', np.uint16),
-					('servos', servo_dt, (32))])
+	servos_shared_dt = SharedIPC.cacheAligned([
+					('servos', servo_dt, (32)),
+					('generation', np.uint32),	# Incremented after each change to the servos
+					('heartbeat', np.float64)])
+	shared_dt = servos_shared_dt
 	filename = '/dev/shm/servo_control_shared.mmf'
-	
-	def create(self):
-		try:
-			self.open()
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(ServoControlSharedIPC.filename, offset=0, dtype=ServoControlSharedIPC.servos_shared_dt, mode='w+', shape=(1))
-	
-	def open(self):
-		# Read/write (no create)
-		self.data  = np.memmap(ServoControlSharedIPC.filename, offset=0, dtype=ServoControlSharedIPC.servos_shared_dt, mode='r+')
+
+	def attachViews(self, data):
+		self._status = data['servos']['status'][0]
+		self._position = data['servos']['position'][0]
+		self._bankGeneration = data['generation']
 
 	def setPosition(self, servo, value, status=1):
-		self.data[0]['servos'][servo]['position'] = value
-		self.data[0]['servos'][servo]['status'] = status
+		value = np.float32(value)	# As stored, so an unchanged value compares equal
+		if self._position[servo] != value or self._status[servo] != status:
+			self._position[servo] = value
+			self._status[servo] = status
+			self._bankGeneration[0] += 1
+	def set_many(self, servos, positions, status=1):
+		# Set several servos at once, e.g. set_many([5, 6], [0.2, -0.4])
+		servos = np.asarray(servos)
+		positions = np.asarray(positions, dtype=np.float32)
+		if np.any(self._position[servos] != positions) or np.any(self._status[servos] != status):
+			self._position[servos] = positions
+			self._status[servos] = status
+			self._bankGeneration[0] += 1
+	def get_all(self):
+		# Copies of the status and position of every servo
+		return self._status.copy(), self._position.copy()
+	def getBankGeneration(self):
+		# Changes whenever any servo does, compare against the last value seen before calling get_all()
+		return self._bankGeneration[0]
 	def getPosition(self, servo):
-		return self.data[0]['servos'][servo]['position'].copy()
+		return self._position[servo]
 	def getStatus(self, servo):
-		return self.data[0]['servos'][servo]['status'].copy()
-		
-	def checkWatchdog(self):
-		if self.data[0]['watchdog'] > 0:
-			# countdown
-			self.data[0]['watchdog'] -= 1
-		return self.data[0]['watchdog']
-	def resetWatchdog(self, count = 100):
-		self.data[0]['watchdog'] = count
-		
-
+		return self._status[servo]
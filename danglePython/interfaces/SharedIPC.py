@@ -0,0 +1,216 @@
+import os
+import time
+import fcntl
+import zlib
+import numpy as np
+from interfaces import Futex
+
+class SharedIPCError(Exception):
+	''' Segment missing, or not laid out as this code expects
+	'''
+	pass
+
+class SharedIPC:
+	''' Common base class for the shared memory structures in /dev/shm.
+		Subclasses define shared_dt (the structure of the whole segment) and filename, and override attachViews() to
+		precompute flat views of the fields used on hot paths.  Accessors then become a single index into a view rather
+		than re-walking self.data[0][field][index][subfield] on every call.
+		If the structure has a 'heartbeat' field, the writer calls resetWatchdog() to stamp it with the (system-wide) monotonic
+		time each time it is alive.  Readers check it against their own timeout with checkWatchdog(), which has no side effects,
+		and treat the values as unreliable once it has expired.
+		Each segment starts with a small header identifying the layout, so a file left behind by an older version is rejected
+		rather than silently reinterpreted.  The header also holds a generation counter.  Writers call publish() after each
+		complete update, and readers can block in waitForUpdate() rather than polling.
+		If the structure has 'strings' and 'numberstrings' fields, they hold an append-only string table so results can refer
+		to names by a small integer id, see getStringId().
+	'''
+	header_dt = np.dtype([
+					('magic', 'S4'),
+					('generation', np.uint32),	# Incremented by publish(), also used as the futex word
+					('schema', np.uint32),		# Hash of shared_dt
+					('pid', np.uint32),			# Process that made the segment
+					('size', np.uint64),		# Total size of the file
+					('waiters', np.uint32)])	# Number of readers blocked in waitForUpdate()
+	CACHE_LINE = 64
+	HEADER_SIZE = CACHE_LINE	# Header has its own cache line, the data follows
+	MAGIC = b'DIPC'
+	WATCHDOG_TIMEOUT = 1.0	# Seconds without a heartbeat before a reader treats the values as unreliable
+	shared_dt = None
+	filename = None
+
+	@staticmethod
+	def cacheAligned(regions):
+		''' Structure as np.dtype(regions) but with each region starting on its own cache line.  Used to keep fields written by
+			different processes apart, so a write by one doesn't keep invalidating the lines the other is using.
+		'''
+		packed = np.dtype(regions)
+		offsets = []
+		offset = 0
+		for name in packed.names:
+			offsets.append(offset)
+			offset += -(-packed.fields[name][0].itemsize // SharedIPC.CACHE_LINE) * SharedIPC.CACHE_LINE
+		return np.dtype({'names': packed.names, 'formats': [packed.fields[name][0] for name in packed.names],
+						'offsets': offsets, 'itemsize': offset})
+
+	def create(self):
+		''' Read/write, creating the file if it doesn't exist yet.  Several writers often start at once, so an existing file is
+			only replaced if it has a different layout, otherwise a writer that had already mapped it would be left writing
+			to a file nobody else sees.
+		'''
+		if not os.path.exists(self.filename):
+			self.makeSegment(replace = False)
+		try:
+			self.attach('r+')
+		except SharedIPCError:
+			self.makeSegment(replace = True)
+			self.attach('r+')
+
+	def open(self):
+		# Read/write (no create)
+		self.attach('r+')
+
+	def read(self):
+		# Read only, creating the file first if no writer has done so yet
+		if not os.path.exists(self.filename):
+			self.makeSegment(replace = False)
+		self.attach('r')
+
+	def segmentSize(self):
+		return SharedIPC.HEADER_SIZE + self.shared_dt.itemsize
+
+	def schemaHash(self):
+		return zlib.crc32(str(self.shared_dt.descr).encode())
+
+	def makeSegment(self, replace):
+		''' Create a zeroed segment with a valid header.  It is built in a temporary file then moved into place in one step, so
+			other processes see either no file or a complete one.  Unless replace is set, an existing file is left alone.
+		'''
+		header = np.zeros(1, dtype=SharedIPC.header_dt)
+		header['magic'] = SharedIPC.MAGIC
+		header['schema'] = self.schemaHash()
+		header['pid'] = os.getpid()
+		header['size'] = self.segmentSize()
+		temp = f'{self.filename}.{os.getpid()}.tmp'
+		with open(temp, 'wb') as f:
+			f.write(header.tobytes().ljust(SharedIPC.HEADER_SIZE, b'\0'))
+			f.truncate(self.segmentSize())
+		try:
+			if replace:
+				os.replace(temp, self.filename)
+			else:
+				os.link(temp, self.filename)	# Fails if another process got there first
+		except FileExistsError:
+			pass
+		finally:
+			if os.path.exists(temp):
+				os.unlink(temp)
+
+	def attach(self, mode):
+		# Map the whole file once and check the header before using it
+		try:
+			size = os.stat(self.filename).st_size
+		except FileNotFoundError:
+			raise SharedIPCError(f'{self.filename} does not exist, has the writer been started?')
+		if size != self.segmentSize():
+			raise SharedIPCError(f'{self.filename} is {size} bytes, expected {self.segmentSize()}')
+		self.segment = np.memmap(self.filename, dtype=np.uint8, mode=mode)
+		self.header = self.segment[:SharedIPC.header_dt.itemsize].view(SharedIPC.header_dt)
+		if self.header['magic'][0] != SharedIPC.MAGIC or self.header['schema'][0] != self.schemaHash():
+			raise SharedIPCError(f'{self.filename} has a different layout, it was created by another version')
+		self.data = self.segment[SharedIPC.HEADER_SIZE:].view(self.shared_dt)
+		self._generation = self.header['generation']
+		self.attachWaiters(mode)
+		self._seenGeneration = self._generation[0]
+		if 'heartbeat' in self.shared_dt.names:
+			self._heartbeat = self.data['heartbeat']
+		if 'strings' in self.shared_dt.names:
+			self._numberstrings = self.data['numberstrings']
+			self._strings = self.data['strings'][0]
+			self._stringIds = {string: id for id, string in enumerate(self._strings[:max(1, self._numberstrings[0])])}
+			self._stringCache = self._strings[:0].copy()
+		self.attachViews(self.data)
+
+	def attachWaiters(self, mode):
+		# Readers count themselves in the header whilst waiting, so even a read only reader needs it writable, if allowed
+		try:
+			self._waitersFile = open(self.filename, 'r+b')
+		except OSError:
+			self._waitersFile = None	# Poll instead
+			self._waiters = self.header['waiters']
+			return
+		header = self.header
+		if mode == 'r':
+			header = np.memmap(self._waitersFile, dtype=np.uint8, mode='r+', shape=(SharedIPC.HEADER_SIZE,))
+			header = header[:SharedIPC.header_dt.itemsize].view(SharedIPC.header_dt)
+		self._waiters = header['waiters']
+
+	def addWaiter(self, count):
+		# Change the waiter count under a lock on it, so concurrent readers don't lose each other's updates
+		offset = SharedIPC.header_dt.fields['waiters'][1]
+		fcntl.lockf(self._waitersFile, fcntl.LOCK_EX, 4, offset)
+		self._waiters[0] = int(self._waiters[0]) + count
+		fcntl.lockf(self._waitersFile, fcntl.LOCK_UN, 4, offset)
+
+	def getWriterPid(self):
+		return self.header['pid'][0]
+
+	def attachViews(self, data):
+		# Override to precompute views of individual fields, e.g. self._value = data['channels']['value'][0]
+		pass
+
+	def publish(self):
+		# Mark a complete update and wake any waiting readers.  The wake is a syscall, so skip it whilst no reader is counted
+		# as waiting.  A reader counts itself before it waits, and the wait returns straight away if the generation has
+		# already moved on.  A reader that dies whilst waiting leaves the count high, which only costs unneeded wakes.
+		self._generation[0] += 1
+		if self._waiters[0]:
+			Futex.wake(self._generation)
+
+	def getGeneration(self):
+		return self._generation[0]
+
+	def waitForUpdate(self, timeout = None):
+		''' Block until there has been a publish() since the last call, or timeout (seconds) expires.
+			Returns True if there is an update, False on timeout.
+		'''
+		seen = self._seenGeneration
+		if self._generation[0] != seen:
+			self._seenGeneration = self._generation[0]
+			return True
+		if self._waitersFile is None:
+			self._seenGeneration = Futex.waitForChange(self._generation, seen, timeout, poll = True)
+			return self._seenGeneration != seen
+		self.addWaiter(1)
+		try:
+			self._seenGeneration = Futex.waitForChange(self._generation, seen, timeout)
+		finally:
+			self.addWaiter(-1)
+		return self._seenGeneration != seen
+
+	def getStringId(self, string):
+		# Index of string in the table, adding it if it is new.  Must be done before publishing a frame that uses it.
+		id = self._stringIds.get(string)
+		if id is None:
+			id = max(1, self._numberstrings[0])
+			if id >= len(self._strings):
+				print(f"{type(self).__name__}: string table full, ignoring '{string}'")
+				return 0
+			self._strings[id] = string
+			self._numberstrings[0] = id + 1
+			self._stringIds[string] = id
+		return id
+
+	def getStrings(self):
+		# Local copy of the string table, only refreshed when it has grown
+		count = max(1, self._numberstrings[0])
+		if len(self._stringCache) != count:
+			self._stringCache = self._strings[:count].copy()
+		return self._stringCache
+
+	def checkWatchdog(self, timeout = None):
+		# Seconds left before the heartbeat expires, 0 if it already has
+		timeout = self.WATCHDOG_TIMEOUT if timeout is None else timeout
+		return max(0.0, self._heartbeat[0] + timeout - time.monotonic())
+	def resetWatchdog(self, alive = True):
+		# Stamp the heartbeat, or with alive False mark it as expired straight away
+		self._heartbeat[0] = time.monotonic() if alive else 0.0
@@ -1,46 +1,51 @@
 import numpy as np
+from interfaces.SharedIPC import SharedIPC
 
-class SimpleControlSharedIPC:
+class SimpleControlSharedIPC(SharedIPC):
 	''' Shared memory structure to control simple outputs, such as LEDs, solenoids and activators.
 		Values provided are 0-255 with interpretation being output-specific, e.g.
 			Simple RGB LED - R=0x04, G=0x02, B=0x01
 			Brightness controlled LED - 0=off, 255=Full on
 			Solenoid/activator - 0 = off, 255 = fully activated
-		Watchdog will be decremented on each control loop and if reaches zero, the device-specific "safe" action is taken.  Set to 100 for 1 second protection.
+		If the controller's heartbeat is more than a second old, the device-specific "safe" action is taken.
+		As for ServoControlSharedIPC, writers bump the bank generation whenever a control actually changes.
 	'''
 	control_dt = np.dtype([
 					('type', np.uint8), 	# 0 = not in use, 1 = simple valued, 2 = one-shot (reset to zero after activating)
 					('value', np.uint8)])
 	controls_shared_dt = np.dtype([
-					('watchdog', np.uint16),
+					('heartbeat', np.float64),
+					('generation', np.uint32),	# Incremented after each change to the controls
 					('controls', control_dt, (32))])
+	shared_dt = controls_shared_dt
 	filename = '/dev/shm/simple_control_shared.mmf'
-	
-	def create(self):
-		try:
-			self.open()
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(SimpleControlSharedIPC.filename, offset=0, dtype=SimpleControlSharedIPC.controls_shared_dt, mode='w+', shape=(1))
-	
-	def open(self):
-		# Read/write (no create)
-		self.data  = np.memmap(SimpleControlSharedIPC.filename, offset=0, dtype=SimpleControlSharedIPC.controls_shared_dt, mode='r+')
+
+	def attachViews(self, data):
+		self._type = data['controls']['type'][0]
+		self._value = data['controls']['value'][0]
+		self._bankGeneration = data['generation']
 
 	def setValue(self, control, value, type = 1):
-		self.data[0]['controls'][control]['value'] = value
-		self.data[0]['controls'][control]['type'] = type
+		value = np.uint8(value)		# As stored, so an unchanged value compares equal
+		if self._value[control] != value or self._type[control] != type:
+			self._value[control] = value
+			self._type[control] = type
+			self._bankGeneration[0] += 1
+	def set_many(self, controls, values, type = 1):
+		# Set several controls at once, e.g. set_many([20, 21], [255, 0])
+		controls = np.asarray(controls)
+		values = np.asarray(values, dtype=np.uint8)
+		if np.any(self._value[controls] != values) or np.any(self._type[controls] != type):
+			self._value[controls] = values
+			self._type[controls] = type
+			self._bankGeneration[0] += 1
+	def get_all(self):
+		# Copies of the type and value of every control
+		return self._type.copy(), self._value.copy()
+	def getBankGeneration(self):
+		# Changes whenever any control does, compare against the last value seen before calling get_all()
+		return self._bankGeneration[0]
 	def getValue(self, control):
-		return self.data[0]['controls'][control]['value'].copy()
+		return self._value[control]
 	def getType(self, control):
-		return self.data[0]['controls'][control]['type'].copy()
-		
-	def checkWatchdog(self):
-		if self.data[0]['watchdog'] > 0:
-			# countdown
-			self.data[0]['watchdog'] -= 1
-		return self.data[0]['watchdog']
-	def resetWatchdog(self, count = 100):
-		self.data[0]['watchdog'] = count
-		
-
+		return self._type[control]
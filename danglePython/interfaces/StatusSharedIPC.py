@@ -1,45 +1,76 @@
+import time
 import numpy as np
 from collections import namedtuple
+from interfaces.SharedIPC import SharedIPC
 
-class StatusSharedIPC:
+class StatusSharedIPC(SharedIPC):
 	# Structure of the status shared memory
 	status_dt = np.dtype([
+					('sequence', np.uint32),	# Seqlock counter, odd whilst an update is in progress
 					('title', np.dtype('U80')),
 					('subtitle',np.dtype('U80')),
 					('additional',np.dtype('U160'))
 					])
+	shared_dt = status_dt
 	filename = '/dev/shm/status_info.mmf'
+	MIN_INTERVAL = 0.1		# Publish at most 10 times a second
+	REFRESH_INTERVAL = 1.0	# Re-format unchanged parameters this often, in case they have been modified in place
+
+	def attachViews(self, data):
+		self._sequence = data['sequence']
+		self._title = data['title']
+		self._subtitle = data['subtitle']
+		self._additional = data['additional']
+		# Writer, last status written and any held back by the rate limit
+		self._lastStatus = None
+		self._pendingStatus = None
+		self._lastPublishTime = 0.0
 
-	def create(self):
-		try:
-			# Try existing file first
-			self.data  = np.memmap(StatusSharedIPC.filename, offset=0, dtype=StatusSharedIPC.status_dt, mode='r+', shape=(1))
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(StatusSharedIPC.filename, offset=0, dtype=StatusSharedIPC.status_dt, mode='w+', shape=(1))
-	
-	def read(self):
-		# Read only
-		try:
-			# Try existing file first
-			self.data  = np.memmap(StatusSharedIPC.filename, offset=0, dtype=StatusSharedIPC.status_dt, mode='r')
-		except:
-			# Need to create first
-			self.data  = np.memmap(StatusSharedIPC.filename, offset=0, dtype=StatusSharedIPC.status_dt, mode='w+', shape=(1))
-			
 	def setStatus(self, title, subtitle = "", parameters = None):
-		self.data[0]['title'] = title
-		self.data[0]['subtitle'] = subtitle
-		self.data[0]['additional'] = "" if parameters is None else f"{parameters}"
+		# Cheap to call every tick.  Only changes are written, at most every MIN_INTERVAL, so call flush() regularly to
+		# write out any that have been held back.
+		last = self._lastStatus if self._pendingStatus is None else self._pendingStatus
+		if last is not None and last[0] == title and last[1] == subtitle and last[2] is parameters and \
+				time.monotonic() - self._lastPublishTime < StatusSharedIPC.REFRESH_INTERVAL:
+			return
+		self._pendingStatus = (title, subtitle, parameters)
+		self.flush()
+
+	def flush(self):
+		now = time.monotonic()
+		if self._pendingStatus is not None and now - self._lastPublishTime >= StatusSharedIPC.MIN_INTERVAL:
+			title, subtitle, parameters = self._pendingStatus
+			additional = "" if parameters is None else f"{parameters}"
+			self._lastStatus = self._pendingStatus
+			self._pendingStatus = None
+			self._lastPublishTime = now
+			if title != self._title[0] or subtitle != self._subtitle[0] or additional != self._additional[0]:
+				self._write(title, subtitle, additional)
 			
 	def clear(self):
-		self.data[0]['title'] = ""
-		self.data[0]['subtitle'] = ""
-		self.data[0]['additional'] = ""
+		self._lastStatus = ("", "", None)
+		self._pendingStatus = None
+		self._write("", "", "")
+
+	def _write(self, title, subtitle, additional):
+		self._sequence[0] += 1	# Odd, readers of all three will retry
+		self._title[0] = title
+		self._subtitle[0] = subtitle
+		self._additional[0] = additional
+		self._sequence[0] += 1
+		self.publish()
 
+	def get_all(self):
+		# Title, subtitle and additional text copied together, retrying if the writer was part way through an update
+		while True:
+			sequence = self._sequence[0]
+			if sequence & 1 == 0:
+				status = self.data[0].copy()
+				if self._sequence[0] == sequence:
+					return status['title'], status['subtitle'], status['additional']
 	def getTitle(self):
-		return self.data[0]['title']
+		return self._title[0]
 	def getSubtitle(self):
-		return self.data[0]['subtitle']
+		return self._subtitle[0]
 	def getAdditional(self):
-		return self.data[0]['additional']
+		return self._additional[0]
@@ -0,0 +1,117 @@
+import os
+import time
+import fcntl
+import numpy as np
+from interfaces.SharedIPC import SharedIPC
+
+class TelemetrySharedIPC(SharedIPC):
+	''' High rate telemetry for observing internals, e.g. PID terms, motor loop values, vision timings.
+		Each producer process claims its own ring of (timestamp, channel, value) records, so any number of processes can push
+		without locking.  Channels are named, with the names held in the string table.  Viewers and loggers keep a cursor
+		per ring and drain everything new in bulk.
+	'''
+	PRODUCERS = 8
+	RING = 4096		# Records per producer
+	telemetry_record_dt = np.dtype([
+					('timestamp',np.float64),	# time.monotonic()
+					('channel',np.uint16),		# Index into strings
+					('value',np.float32)], align=True)
+	telemetry_producer_dt = SharedIPC.cacheAligned([
+					('pid',np.uint32),		# 0 = free
+					('head',np.uint64),		# Number of records ever pushed, record n is in slot n % RING
+					('records',telemetry_record_dt, (RING))])
+	telemetry_shared_dt = np.dtype([
+					('producers',telemetry_producer_dt, (PRODUCERS)),
+					('numberstrings',np.uint16),
+					('strings',np.dtype('U32'), (256))])
+	shared_dt = telemetry_shared_dt
+	filename = '/dev/shm/telemetry_shared.mmf'
+
+	def attachViews(self, data):
+		producers = data['producers'][0]
+		self._pid = producers['pid']
+		self._head = producers['head']
+		self._records = producers['records']
+		# Reader, head of each ring at the last drain()
+		self.cursors = [int(head) for head in self._head]
+		self.producer = None
+
+	def create(self):
+		SharedIPC.create(self)
+		self.claimProducer()
+
+	def lock(self):
+		# Exclusive lock on the segment for the rare multi-producer updates, released when the returned file is closed
+		f = open(self.filename)
+		fcntl.flock(f, fcntl.LOCK_EX)
+		return f
+
+	def claimProducer(self):
+		# Take a free ring, or one whose process has gone
+		with self.lock():
+			for producer in range(TelemetrySharedIPC.PRODUCERS):
+				pid = int(self._pid[producer])
+				if pid == 0 or pid == os.getpid() or not self.processExists(pid):
+					self._pid[producer] = os.getpid()
+					self.producer = producer
+					self._ring = self._records[producer]
+					self._next = int(self._head[producer])	# Carry on from the last owner, so readers' cursors stay valid
+					return
+		raise RuntimeError(f"TelemetrySharedIPC: all {TelemetrySharedIPC.PRODUCERS} producer rings in use")
+
+	@staticmethod
+	def processExists(pid):
+		try:
+			os.kill(pid, 0)
+		except ProcessLookupError:
+			return False
+		except PermissionError:
+			pass
+		return True
+
+	def channel(self, name):
+		# Id for the named channel, registering it if new.  Look these up once rather than on every push().
+		with self.lock():
+			# Pick up any added by other producers
+			self._stringIds = {string: id for id, string in enumerate(self._strings[:max(1, self._numberstrings[0])])}
+			return self.getStringId(name)
+
+	def channelName(self, channel):
+		return self.getStrings()[channel]
+
+	def push(self, channel, value, timestamp = None):
+		self._ring[self._next % TelemetrySharedIPC.RING] = (time.monotonic() if timestamp is None else timestamp, channel, value)
+		self._next += 1
+		self._head[self.producer] = self._next
+
+	def drain(self):
+		''' All records pushed since the last drain(), from every producer, in timestamp order.
+			Where a reader has fallen more than a ring behind a producer, only that producer's most recent records are returned.
+		'''
+		drained = []
+		for producer in range(TelemetrySharedIPC.PRODUCERS):
+			head = int(self._head[producer])
+			count = head - self.cursors[producer]
+			if count < 0:
+				# Segment recreated
+				count = head
+			self.cursors[producer] = head
+			count = min(count, TelemetrySharedIPC.RING - 1)
+			if count == 0:
+				continue
+			ring = self._records[producer]
+			end = head % TelemetrySharedIPC.RING
+			start = end - count
+			if start >= 0:
+				records = ring[start:end].copy()
+			else:
+				records = np.concatenate((ring[start:], ring[:end]))
+			# Drop any overwritten by the producer whilst being copied, including the one it may be part way through
+			overwritten = int(self._head[producer]) - head + 1 - (TelemetrySharedIPC.RING - count)
+			if overwritten > 0:
+				records = records[overwritten:]
+			drained.append(records)
+		if len(drained) == 0:
+			return np.zeros(0, dtype=TelemetrySharedIPC.telemetry_record_dt)
+		records = np.concatenate(drained)
+		return records[np.argsort(records['timestamp'], kind='stable')]
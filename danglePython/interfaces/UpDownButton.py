@@ -13,9 +13,9 @@ class UpDownButton(SensorInterface):
 		self.sensorIPC = sensorIPC
 		self.buttonUp = buttonUp
 		self.buttonDown = buttonDown
+		self.channelUp = sensorIPC.snapshotData[0]['digital'][buttonUp]
+		self.channelDown = sensorIPC.snapshotData[0]['digital'][buttonDown]
 		
 	def getValue(self):
-		up = self.sensorIPC.getDigitalValue(self.buttonUp)
-		down = self.sensorIPC.getDigitalValue(self.buttonDown)
-		return up - down
+		return self.channelUp['value'] - self.channelDown['value']
 	
\ No newline at end of file
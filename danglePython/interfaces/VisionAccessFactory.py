@@ -2,6 +2,7 @@ from interfaces.LineAnalysisSharedIPC import LineAnalysisSharedIPC
 from interfaces.ImageAnalysisSharedIPC import ImageAnalysisSharedIPC
 from interfaces.LineHeading import LineHeading
 from interfaces.ImageResult import ImageResult
+from interfaces.IpcBus import IpcBus
 
 class VisionAccessFactory:
 
@@ -11,6 +12,10 @@ class VisionAccessFactory:
 		self.lineIPC.read()
 		self.imageIPC = ImageAnalysisSharedIPC()
 		self.imageIPC.read()
+		# Results are read from the per-tick snapshot
+		bus = IpcBus.getSingleton()
+		bus.attachLine(self.lineIPC)
+		bus.attachImage(self.imageIPC)
 
 	__instance = None
 	@classmethod
@@ -1,128 +1,155 @@
 import numpy as np
 from collections import namedtuple
+from interfaces.SharedIPC import SharedIPC
 
-class VoiceRecognitionSharedIPC:
+class VoiceRecognitionSharedIPC(SharedIPC):
 	# Structure of the voice recognition shared memory
 	word_list_dt = np.dtype([
 					('word', np.dtype('U32')),
 					('confidence',np.float32),		# Recognition confidence 0 - 1.0
 					('timestamp',np.uint64)
 					])
+	# Each newly recognised word is also added to a ring of events, so consumers can pick up just the words since they last looked.
+	# Unlike the image and telemetry segments, words are not interned in the SharedIPC string table.  That is append-only and
+	# sized for a fixed set of names, whereas the recogniser can hear any word, so the table would fill up and later words be
+	# lost.  The word is copied inline instead, at the cost of a larger event.
+	word_event_dt = np.dtype([
+					('sequence',np.uint32),		# Event number, the event is in slot sequence % EVENTS
+					('word', np.dtype('U32')),	# Inline rather than a string id, see above
+					('status',np.uint16),		# 1=provisional result, 2=full result
+					('confidence',np.float32),
+					('timestamp',np.uint64)
+					])
+	EVENTS = 256
 	voice_recognition_shared_dt = np.dtype([
-					('watchdog',np.uint16),
+					('heartbeat',np.float64),
 					('currentstatus', np.uint16),	# 0=no value, 1=provisional result, 2=full result
-					('currentnumberwords',np.uint16),
-					('currentwords',word_list_dt, (64)),
-					('laststatus', np.uint16),	# 0=no value, 1=provisional result, 2=full result
-					('lastnumberwords',np.uint16),
-					('lastwords',word_list_dt, (64))])
+					('laststatus', np.uint16),	# Status of words, the last non-empty result
+					('numberwords',np.uint16),
+					('words',word_list_dt, (64)),
+					('eventsequence',np.uint32),	# Sequence of the latest event written
+					('events',word_event_dt, (EVENTS))])
+	shared_dt = voice_recognition_shared_dt
 	filename = '/dev/shm/voice_recognition.mmf'
 
 	# Interface class to set the results array
 	VoiceRecognitionResult = namedtuple('VoiceRecognitionResult', 'word confidence timestamp')
-	
-	def create(self):
-		try:
-			# Try existing file first
-			self.data  = np.memmap(VoiceRecognitionSharedIPC.filename, offset=0, dtype=VoiceRecognitionSharedIPC.voice_recognition_shared_dt, mode='r+', shape=(1))
-		except:
-			# Create/overwrite
-			self.data  = np.memmap(VoiceRecognitionSharedIPC.filename, offset=0, dtype=VoiceRecognitionSharedIPC.voice_recognition_shared_dt, mode='w+', shape=(1))
-	
-	def read(self):
-		# Read only
-		try:
-			# Try existing file first
-			self.data  = np.memmap(VoiceRecognitionSharedIPC.filename, offset=0, dtype=VoiceRecognitionSharedIPC.voice_recognition_shared_dt, mode='r')
-		except:
-			# Need to create first
-			self.data  = np.memmap(VoiceRecognitionSharedIPC.filename, offset=0, dtype=VoiceRecognitionSharedIPC.voice_recognition_shared_dt, mode='w+', shape=(1))
-			
+
+	def attachViews(self, data):
+		self._currentstatus = data['currentstatus']
+		self._laststatus = data['laststatus']
+		self._numberwords = data['numberwords']
+		self._words = data['words'][0]
+		self._eventsequence = data['eventsequence']
+		self._events = data['events'][0]
+		# Writer, words of the current utterance as last shared, to compare partial results against
+		self._utteranceWords = []
+		# Reader, sequence of the last event returned by poll_new_words()
+		self.wordCursor = int(self._eventsequence[0])
+
 	def shareResults(self, status, results):
-		self.data[0]['currentstatus'] = status
-		for result in range(len(results)):
-			res = self.data[0]['currentwords'][result]
-			res['word'] = results[result].word
-			res['confidence'] = results[result].confidence
-			res['timestamp'] = results[result].timestamp
-		self.data[0]['currentnumberwords'] = len(results)
-
-		# Invalidate the rest
-		#for result in range(len(results), len(self.data[0]['currentwords'])):
-		#	self.data[0]['currentwords'][result]['status'] = 0	# Invalid
-			
-		# Also copy to last if we have a non-null value
+		# Also keep as last if we have a non-null value
 		if len(results) > 0:
-			self.data[0]['laststatus'] = status
-			self.data[0]['lastwords'] = self.data[0]['currentwords']
-			self.data[0]['lastnumberwords'] = len(results)
+			self._laststatus[0] = status
+			self._words[:len(results)] = results
+			self._numberwords[0] = len(results)
+			# Partial results repeat the utterance so far, and the recogniser may revise earlier words in later partial or the
+			# full result.  So add the words that are new or have changed at their position.
+			for position, result in enumerate(results):
+				if position >= len(self._utteranceWords) or result.word != self._utteranceWords[position]:
+					self.addWordEvent(result, status)
+			self._utteranceWords = [] if status == 2 else [result.word for result in results]
+			self._currentstatus[0] = status
 		else:
-			self.data[0]['currentstatus'] = 0
+			self._currentstatus[0] = 0
 		self.resetWatchdog()
-			
+		self.publish()
+
+	def addWordEvent(self, result, status):
+		sequence = self._eventsequence[0] + 1
+		event = self._events[sequence % VoiceRecognitionSharedIPC.EVENTS]
+		event['word'] = result.word
+		event['status'] = status
+		event['confidence'] = result.confidence
+		event['timestamp'] = result.timestamp
+		event['sequence'] = sequence
+		# Finally make it visible
+		self._eventsequence[0] = sequence
+
 	def clearCurrentResults(self):
-		self.data[0]['currentnumberwords'] = 0
-		self.data[0]['currentnumberwords'] = 0
-		self.data[0]['currentstatus'] = 0
-		#for result in range(len(self.data[0]['words'])):
-		#	self.data[0]['words'][result]['status'] = status	# Set Invalid
+		self._currentstatus[0] = 0
 		self.resetWatchdog()
+		self.publish()
+
+	def poll_new_words(self):
+		''' Words recognised since the previous call (or since opening, for the first call), oldest first.
+			If the reader has fallen more than a ring's worth behind, only the most recent are returned.
+		'''
+		sequence = int(self._eventsequence[0])
+		count = min(sequence - self.wordCursor, VoiceRecognitionSharedIPC.EVENTS - 1)
+		if count < 0:
+			# Writer restarted
+			count = min(sequence, VoiceRecognitionSharedIPC.EVENTS - 1)
+		self.wordCursor = sequence
+		if count == 0:
+			return []
+		slots = np.arange(sequence - count + 1, sequence + 1)
+		events = self._events[slots % VoiceRecognitionSharedIPC.EVENTS]
+		# Drop any overwritten whilst being copied
+		events = events[events['sequence'] == slots]
+		return [VoiceRecognitionSharedIPC.VoiceRecognitionResult(word = str(word), confidence = confidence, timestamp = timestamp)
+					for word, confidence, timestamp in zip(events['word'], events['confidence'], events['timestamp'])]
+
+	def findNewSpokenWord(self, searchWords):
+		# The last of searchWords spoken since the previous call, or "" if none
+		found = ""
+		for result in self.poll_new_words():
+			if result.word in searchWords:
+				found = result.word
+		return found
 
 	def getCurrentResults(self):
 		results = []
-		for result in range(self.data[0]['currentnumberwords']):
-			res = self.data[0]['currentwords'][result]
-			results.append(
-				VoiceRecognitionSharedIPC.VoiceRecognitionResult(
-					name = res['word'].copy(),
-					confidence = res['confidence'].copy(),
-					timestamp = res['timestamp'].copy()))
-		return self.data[0]['currentstatus'], results
-			
+		if self._currentstatus[0] != 0:
+			results = self.getLastResults()[1]
+		return self._currentstatus[0], results
+
 	def getLastResults(self):
 		results = []
-		for result in range(self.data[0]['lastnumberwords']):
-			res = self.data[0]['lastwords'][result]
+		for result in range(self._numberwords[0]):
+			res = self._words[result]
 			results.append(
 				VoiceRecognitionSharedIPC.VoiceRecognitionResult(
-					name = res['word'].copy(),
+					word = res['word'].copy(),
 					confidence = res['confidence'].copy(),
 					timestamp = res['timestamp'].copy()))
-		return self.data[0]['currentstatus'], results
-			
+		return self._laststatus[0], results
+
 	def getStatus(self):
-		return self.data[0]['currentstatus']
-	
+		return self._currentstatus[0]
+
 	def getWord(self, result):
-		return self.data[0]['currentwords'][result]['word']
+		return self._words[result]['word']
 
 	def getCurrentWords(self):
-		results = [self.data[0]['currentwords'][w]['word'].copy() for w in range(self.data[0]['currentnumberwords'])]
-		return self.data[0]['currentstatus'], results
-		
+		results = []
+		if self._currentstatus[0] != 0:
+			results = self.getLastWords()[1]
+		return self._currentstatus[0], results
+
 	def getLastWords(self):
-		results = [self.data[0]['lastwords'][w]['word'].copy() for w in range(self.data[0]['lastnumberwords'])]
-		return self.data[0]['laststatus'], results
+		results = [self._words[w]['word'].copy() for w in range(self._numberwords[0])]
+		return self._laststatus[0], results
 
 	def findLastSpokenWord(self, searchWords):
-		words = self.data[0]['lastwords']
-		for w in reversed(range(self.data[0]['lastnumberwords'])):
+		words = self._words
+		for w in reversed(range(self._numberwords[0])):
 			if words[w]['word'] in searchWords:
 				return words[w]['word'].copy()
 		return ""
-		
+
 	def getConfidence(self, result):
-		return self.data[0]['currentwords'][result]['confidence']
+		return self._words[result]['confidence']
 
 	def getTimestamp(self, result):
-		return self.data[0]['currentwords'][result]['timestamp']
-	
-	def checkWatchdog(self):
-		if self.data[0]['watchdog'] > 0:
-			# countdown
-			self.data[0]['watchdog'] -= 1
-		return self.data[0]['watchdog']
-		
-	def resetWatchdog(self, count = 100):
-		self.data[0]['watchdog'] = count
-
+		return self._words[result]['timestamp']
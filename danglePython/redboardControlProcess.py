@@ -7,6 +7,7 @@ from hardware.Motor import Motor
 from interfaces.MotorControlSharedIPC import MotorControlSharedIPC
 from interfaces.ServoControlSharedIPC import ServoControlSharedIPC
 from interfaces.SimpleControlSharedIPC import SimpleControlSharedIPC
+from interfaces.TelemetrySharedIPC import TelemetrySharedIPC
 from interfaces.Config import Config
 import atexit
 
@@ -25,13 +26,21 @@ class MotorControlProcess:
 		self.servosIPC = ServoControlSharedIPC()
 		self.servosIPC.create()
 		self.currentServoValues = [0.0]*32
+		self.servoGeneration = None
 		self.simpleControlsIPC = SimpleControlSharedIPC()
 		self.simpleControlsIPC.create()
 		self.currentSimpleValues = [0]*32
+		self.simpleGeneration = None
+		self.telemetry = TelemetrySharedIPC()
+		self.telemetry.create()
+		self.torqueChannels = {2: self.telemetry.channel("motor.left.torque"), 1: self.telemetry.channel("motor.right.torque")}
+		self.positionChannels = {2: self.telemetry.channel("motor.left.position"), 1: self.telemetry.channel("motor.right.position")}
+		self.speedChannels = {2: self.telemetry.channel("motor.left.speed"), 1: self.telemetry.channel("motor.right.speed")}
 		# Config
 		config = Config()
 		self.pollrate = (1.0 / config.get("redboard.motor.pollrate", 100))
 		self.delta_torque = self.pollrate * config.get("redboard.motor.accelmax", 4.0)
+		self.interpolate = config.get("redboard.motor.interpolate", True)
 		self.readEncoders = config.get("motors.encoders.fromioexpander", True)
 		self.pidSpeedControl = config.get("motors.speedmode.pidenabled", True)
 		self.pidValues = config.get("motors.speedmode.pidconstants", (0.001, 0.0001, 0.001))
@@ -75,9 +84,14 @@ class MotorControlProcess:
 
 		while not done:
 			if running:
-				# Adjust torque
-				torqueL = -self.motorsIPC.getRequiredTorque(2)
-				torqueR = self.motorsIPC.getRequiredTorque(1)
+				# Adjust torque, following the controller's trajectory between its updates
+				if self.interpolate:
+					now = time.monotonic()
+					torqueL = -self.motorsIPC.getSetpoint(2, now)
+					torqueR = self.motorsIPC.getSetpoint(1, now)
+				else:
+					torqueL = -self.motorsIPC.getRequiredTorque(2)
+					torqueR = self.motorsIPC.getRequiredTorque(1)
 				if torqueL != self.currentMotorValues[2] or torqueR != self.currentMotorValues[1]:
 					self.currentMotorValues[2] = torqueL
 					self.currentMotorValues[1] = torqueR
@@ -87,6 +101,8 @@ class MotorControlProcess:
 					pidR.setpoint = torqueR
 				motorL.setTorque(torqueL)
 				motorR.setTorque(torqueR)
+				self.telemetry.push(self.torqueChannels[2], torqueL)
+				self.telemetry.push(self.torqueChannels[1], torqueR)
 				
 				# Read the motor encoders
 				if self.readEncoders:
@@ -94,6 +110,8 @@ class MotorControlProcess:
 					encoderPositionR = ioe.read_rotary_encoder(2)
 					self.motorsIPC.setCurrentPosition(2, encoderPositionL)
 					self.motorsIPC.setCurrentPosition(1, encoderPositionR)
+					self.telemetry.push(self.positionChannels[2], encoderPositionL)
+					self.telemetry.push(self.positionChannels[1], encoderPositionR)
 					print(f"encoders: {encoderPositionL} {encoderPositionR}, speeds: {speedL} {speedR}")
 					# Calculate speeds
 					nowTime = time.perf_counter()
@@ -105,6 +123,8 @@ class MotorControlProcess:
 						speedR = (encoderPositionR - lastEncoderPositionR) // deltaT
 						lastEncoderPositionR = encoderPositionR
 						self.motorsIPC.setCurrentSpeed(1, speedR)
+						self.telemetry.push(self.speedChannels[2], speedL)
+						self.telemetry.push(self.speedChannels[1], speedR)
 						startTime = nowTime
 						if self.pidSpeedControl:
 							errorL = pidL(speedL)
@@ -112,38 +132,47 @@ class MotorControlProcess:
 							print(f"pid errors: {errorL:.2f} {errorR:.2f}")
 
 					
-				# Also copy over all of the servo values
-				for servo in MotorControlProcess.managedServos:
-					if self.servosIPC.getStatus(servo) > 0:
-						newPosition = self.servosIPC.getPosition(servo) * 1000.0 + 1500.0 # 500-2500 is allowed range
-						if newPosition != self.currentServoValues[servo]:
-							self.currentServoValues[servo] = newPosition
-							redboard.servo_P(servo, newPosition)
-					elif self.currentServoValues[servo] != 0.0:
-						self.currentServoValues[servo] = 0.0
-						redboard.servo_off(servo)
-						
-				# Simple control #0 is the colour LED control
-				if self.simpleControlsIPC.getType(0) > 0:
-					led = self.simpleControlsIPC.getValue(0)
-					if led != self.currentSimpleValues[0]: 
-						self.currentSimpleValues[0] = led
-						if led & 0x04:
-							redboard.red_on()
-						else:
-							redboard.red_off()
-						if led & 0x02:
-							redboard.green_on()
-						else:
-							redboard.green_off()
-						if led & 0x01:
-							redboard.blue_on()
-						else:
-							redboard.blue_off()
-				# GPIO 20/21 as simple binary values
-				for gpio in [20,21]:
-					if self.simpleControlsIPC.getType(gpio) > 0:
-						redboard.setPin(gpio, 1 if self.simpleControlsIPC.getValue(gpio) > 0.5 else 0)
+				# Also copy over all of the servo values, if any have changed
+				generation = self.servosIPC.getBankGeneration()
+				if generation != self.servoGeneration:
+					self.servoGeneration = generation
+					status, positions = self.servosIPC.get_all()
+					newPositions = positions * 1000.0 + 1500.0 # 500-2500 is allowed range
+					for servo in MotorControlProcess.managedServos:
+						if status[servo] > 0:
+							if newPositions[servo] != self.currentServoValues[servo]:
+								self.currentServoValues[servo] = newPositions[servo]
+								redboard.servo_P(servo, newPositions[servo])
+						elif self.currentServoValues[servo] != 0.0:
+							self.currentServoValues[servo] = 0.0
+							redboard.servo_off(servo)
+
+				# Likewise the simple controls
+				generation = self.simpleControlsIPC.getBankGeneration()
+				if generation != self.simpleGeneration:
+					self.simpleGeneration = generation
+					types, values = self.simpleControlsIPC.get_all()
+					# Simple control #0 is the colour LED control
+					if types[0] > 0:
+						led = values[0]
+						if led != self.currentSimpleValues[0]: 
+							self.currentSimpleValues[0] = led
+							if led & 0x04:
+								redboard.red_on()
+							else:
+								redboard.red_off()
+							if led & 0x02:
+								redboard.green_on()
+							else:
+								redboard.green_off()
+							if led & 0x01:
+								redboard.blue_on()
+							else:
+								redboard.blue_off()
+					# GPIO 20/21 as simple binary values
+					for gpio in [20,21]:
+						if types[gpio] > 0:
+							redboard.setPin(gpio, 1 if values[gpio] > 0.5 else 0)
 
 			time.sleep(self.pollrate)
 
@@ -152,6 +181,11 @@ class MotorControlProcess:
 				running = False
 				for servo in MotorControlProcess.managedServos:
 					redboard.servo_off(servo)
+				# Resend everything when resumed
+				self.servoGeneration = None
+				self.simpleGeneration = None
+				self.currentServoValues = [0.0]*32
+				self.currentSimpleValues = [0]*32
 				for i in range(int(1/self.delta_torque)+1):
 					# Allow the motors to return to idle normally
 					motorL.setTorque(0.0)
@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+# Latency and throughput of each of the /dev/shm segments, written to a JSON report so runs on different machines or
+# with different layouts can be compared.  For each segment type:
+#	latency - a writer process publishes an update every --interval seconds whilst a reader process blocks in
+#			  waitForUpdate() then reads it.  One-way latency is from just before the write to just after the read.
+#	torn    - the writer updates flat out for --duration seconds whilst the reader reads flat out, checking each read
+#			  for values from two different updates.
+#	ops     - calls per second of a typical accessor, in this process.
+# Benchmark copies of the segments are used, so it is safe to run alongside the real processes.
+# Run from the danglePython folder:  python3 -m test.benchmarkIPC [-o report.json] [segment ...]
+import os
+import time
+import json
+import platform
+import argparse
+import multiprocessing
+import numpy as np
+from interfaces.SensorsSharedIPC import SensorsSharedIPC
+from interfaces.MotorControlSharedIPC import MotorControlSharedIPC
+from interfaces.ServoControlSharedIPC import ServoControlSharedIPC
+from interfaces.SimpleControlSharedIPC import SimpleControlSharedIPC
+from interfaces.StatusSharedIPC import StatusSharedIPC
+from interfaces.LineAnalysisSharedIPC import LineAnalysisSharedIPC
+from interfaces.ImageAnalysisSharedIPC import ImageAnalysisSharedIPC
+from interfaces.VoiceRecognitionSharedIPC import VoiceRecognitionSharedIPC
+from interfaces.TelemetrySharedIPC import TelemetrySharedIPC
+
+WRAP = 1 << 20	# Keep written counts exact in float32 fields
+ACCESS_TIME = 0.2	# Seconds to time each accessor for
+
+def benchmarkClass(ipcClass):
+	# Same segment in its own file
+	return type(ipcClass.__name__, (ipcClass,), {'filename': ipcClass.filename.replace('.mmf', '_benchmark.mmf')})
+
+class Segment:
+	''' How to exercise one segment type.  write(ipc, i) makes and publishes update i.  check(ipc) reads the latest update
+		and returns True if it mixes values from two updates.  access(ipc) is the accessor timed for ops/sec.
+	'''
+	def __init__(self, ipcClass, write, check, access, writer = None):
+		self.ipcClass = benchmarkClass(ipcClass)
+		self.write = write
+		self.check = check
+		self.access = access
+		self.writer = writer	# Any setup of the writer process
+
+def writeSensors(ipc, i):
+	ipc.setAnalogValue(0, i % WRAP, timestamp = i % WRAP)
+def checkSensors(ipc):
+	reading = ipc.getAnalogReading(0)
+	return reading['value'] != reading['timestamp']
+
+def writeMotors(ipc, i):
+	ipc.setCurrentSpeed(1, i % WRAP)
+	ipc.setCurrentPosition(1, i % WRAP)
+	ipc.publish()
+def checkMotors(ipc):
+	feedback = ipc.snapshotFeedback()[1]
+	return feedback['actspeed'] != feedback['actposistion']
+
+# Servos, simple controls and status are checked from one get_all() copy written in one go, as separate getter calls
+# would see ordinary interleaving with the writer rather than tearing
+def writeServos(ipc, i):
+	ipc.set_many([0, 1], [i % WRAP, i % WRAP])
+	ipc.publish()
+def checkServos(ipc):
+	status, position = ipc.get_all()
+	return position[0] != position[1]
+
+def writeSimple(ipc, i):
+	ipc.set_many([0, 1], [i % 256, i % 256])
+	ipc.publish()
+def checkSimple(ipc):
+	type, value = ipc.get_all()
+	return value[0] != value[1]
+
+def writerStatus():
+	# Publish every update rather than rate limiting
+	StatusSharedIPC.MIN_INTERVAL = 0.0
+def writeStatus(ipc, i):
+	ipc.setStatus(f"{i}", f"{i}")
+def checkStatus(ipc):
+	title, subtitle, additional = ipc.get_all()
+	return title != subtitle
+
+linePoints = np.zeros((64, 2))
+def writeLine(ipc, i):
+	ipc.shareResults(i, 0.01, i % WRAP, i % WRAP, ((0, 0), (1, 1)), linePoints)
+def checkLine(ipc):
+	frame = ipc.readFrame()
+	return frame['yaw'] != frame['timestamp'] % WRAP
+
+def writeImage(ipc, i):
+	# (status, typeid, nameid, confidence, distance, size, yaw, angle, motorpositions)
+	ipc.resultsBuffer[:4] = (1, ipc.getStringId('Block'), ipc.getStringId(f"{i % 4}"), 1.0, i % WRAP, (0, 0), 0, 0, (0, 0))
+	ipc.publishResults(i, 0.01, 4)
+def checkImage(ipc):
+	frame, timestamp, elapsed, results = ipc.readFrame()
+	return len(results) != 4 or bool(np.any(results.distance != timestamp % WRAP)) or bool(np.any(results.name != f"{timestamp % 4}"))
+
+def writeVoice(ipc, i):
+	ipc.shareResults(2, [VoiceRecognitionSharedIPC.VoiceRecognitionResult(word = f"w{i % 16}", confidence = 1.0, timestamp = i)])
+def checkVoice(ipc):
+	return any(result.word != f"w{result.timestamp % 16}" for result in ipc.poll_new_words())
+
+telemetryChannel = 0
+def writerTelemetry():
+	global telemetryChannel
+	telemetryChannel = None
+def writeTelemetry(ipc, i):
+	global telemetryChannel
+	if telemetryChannel is None:
+		telemetryChannel = ipc.channel('benchmark')
+	ipc.push(telemetryChannel, i % WRAP, timestamp = i % WRAP)
+	ipc.publish()
+def checkTelemetry(ipc):
+	records = ipc.drain()
+	return bool(np.any(records['value'] != records['timestamp']))
+
+SEGMENTS = {
+	'sensors': Segment(SensorsSharedIPC, writeSensors, checkSensors, lambda ipc: ipc.getAnalogValue(0)),
+	'motors': Segment(MotorControlSharedIPC, writeMotors, checkMotors, lambda ipc: ipc.getCurrentSpeed(1)),
+	'servos': Segment(ServoControlSharedIPC, writeServos, checkServos, lambda ipc: ipc.getPosition(0)),
+	'simple': Segment(SimpleControlSharedIPC, writeSimple, checkSimple, lambda ipc: ipc.getValue(0)),
+	'status': Segment(StatusSharedIPC, writeStatus, checkStatus, lambda ipc: ipc.getTitle(), writer = writerStatus),
+	'line': Segment(LineAnalysisSharedIPC, writeLine, checkLine, lambda ipc: ipc.getYaw()),
+	'image': Segment(ImageAnalysisSharedIPC, writeImage, checkImage, lambda ipc: ipc.getDistance(0)),
+	'voice': Segment(VoiceRecognitionSharedIPC, writeVoice, checkVoice, lambda ipc: ipc.findNewSpokenWord(['w1'])),
+	'telemetry': Segment(TelemetrySharedIPC, writeTelemetry, checkTelemetry, lambda ipc: ipc.drain(), writer = writerTelemetry),
+}
+
+def writerProcess(name, mode, count, interval, duration, barrier, done, results):
+	segment = SEGMENTS[name]
+	if segment.writer is not None:
+		segment.writer()
+	ipc = segment.ipcClass()
+	ipc.create()
+	barrier.wait()
+	sent = []
+	if mode == 'latency':
+		# Paced, so each update is received on its own.  Generation after the write identifies it to the reader.
+		for i in range(1, count + 1):
+			time.sleep(interval)
+			start = time.monotonic()
+			segment.write(ipc, i)
+			sent.append((int(ipc.getGeneration()), start))
+	else:
+		i = 0
+		end = time.monotonic() + duration
+		while time.monotonic() < end:
+			for n in range(100):
+				i += 1
+				segment.write(ipc, i)
+		sent = i
+	done.set()
+	results.put(('writer', sent))
+
+def readerProcess(name, mode, barrier, done, results):
+	segment = SEGMENTS[name]
+	ipc = segment.ipcClass()
+	ipc.read()
+	barrier.wait()
+	received = []
+	reads = 0
+	torn = 0
+	if mode == 'latency':
+		while True:
+			if ipc.waitForUpdate(0.05):
+				generation = int(ipc.getGeneration())
+				segment.check(ipc)
+				received.append((generation, time.monotonic()))
+			elif done.is_set():
+				break
+	else:
+		while not done.is_set():
+			for n in range(100):
+				if segment.check(ipc):
+					torn += 1
+			reads += 100
+		received = (reads, torn)
+	results.put(('reader', received))
+
+def runProcesses(name, mode, count = 0, interval = 0, duration = 0):
+	# Writer and reader process, returning what each reported
+	context = multiprocessing.get_context('fork')
+	barrier = context.Barrier(2)
+	done = context.Event()
+	results = context.Queue()
+	processes = [context.Process(target=writerProcess, args=(name, mode, count, interval, duration, barrier, done, results)),
+				 context.Process(target=readerProcess, args=(name, mode, barrier, done, results))]
+	for process in processes:
+		process.start()
+	reported = dict(results.get() for process in processes)
+	for process in processes:
+		process.join()
+	return reported['writer'], reported['reader']
+
+def latency(name, count, interval):
+	sent, received = runProcesses(name, 'latency', count = count, interval = interval)
+	sent = dict(sent)
+	latencies = np.array([at - sent[generation] for generation, at in received if generation in sent]) * 1e6
+	report = {'sent': len(sent), 'received': len(latencies)}
+	if len(latencies) > 0:
+		report.update({'mean_us': float(np.mean(latencies)), 'max_us': float(np.max(latencies))})
+		for percentile in (50, 90, 99, 99.9):
+			report[f'p{percentile}_us'] = float(np.percentile(latencies, percentile))
+	return report
+
+def tornReads(name, duration):
+	writes, (reads, torn) = runProcesses(name, 'torn', duration = duration)
+	return {'writes': writes, 'reads': reads, 'torn': torn, 'rate': torn / reads if reads > 0 else 0.0}
+
+def accessorOps(name):
+	segment = SEGMENTS[name]
+	ipc = segment.ipcClass()
+	ipc.read()
+	access = segment.access
+	calls = 0
+	start = time.perf_counter()
+	while time.perf_counter() - start < ACCESS_TIME:
+		for n in range(1000):
+			access(ipc)
+		calls += 1000
+	return calls / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+	ap = argparse.ArgumentParser()
+	ap.add_argument("segments", nargs="*", default=list(SEGMENTS), help=f"segments to benchmark, from {', '.join(SEGMENTS)}")
+	ap.add_argument("-o", "--output", type=str, default="ipc_benchmark.json", help="JSON report file")
+	ap.add_argument("-n", "--samples", type=int, default=2000, help="updates for the latency test")
+	ap.add_argument("-i", "--interval", type=float, default=0.001, help="seconds between updates for the latency test")
+	ap.add_argument("-d", "--duration", type=float, default=1.0, help="seconds for the torn read test")
+	args = vars(ap.parse_args())
+
+	report = {
+		'machine': platform.machine(),
+		'platform': platform.platform(),
+		'cpus': os.cpu_count(),
+		'python': platform.python_version(),
+		'numpy': np.__version__,
+		'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+		'samples': args['samples'],
+		'interval': args['interval'],
+		'duration': args['duration'],
+		'segments': {}}
+	for name in args['segments']:
+		ipcClass = SEGMENTS[name].ipcClass
+		ipc = ipcClass()
+		ipc.create()
+		results = {
+			'segment_bytes': ipc.segmentSize(),
+			'latency': latency(name, args['samples'], args['interval']),
+			'torn': tornReads(name, args['duration']),
+			'ops_per_sec': accessorOps(name)}
+		os.unlink(ipcClass.filename)
+		report['segments'][name] = results
+		print(f"{name:10s}: latency p50 {results['latency'].get('p50_us', 0):7.1f}us p99 {results['latency'].get('p99_us', 0):7.1f}us, "
+			  f"torn {results['torn']['torn']}/{results['torn']['reads']}, {results['ops_per_sec']:,.0f} ops/sec")
+	with open(args['output'], 'w') as f:
+		json.dump(report, f, indent=2)
+	print(f"Report written to {args['output']}")
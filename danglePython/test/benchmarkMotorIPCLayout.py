@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+# Compare command/feedback round trip times through MotorControlSharedIPC, with the old packed layout against the
+# cache-line aligned one.  Run from the danglePython folder:  python3 -m test.benchmarkMotorIPCLayout
+import os
+import time
+import multiprocessing
+import numpy as np
+from interfaces.MotorControlSharedIPC import MotorControlSharedIPC
+
+ROUND_TRIPS = 20000
+# Busy wait on multi-core machines, where the other process is running on another core.  Otherwise give it the cpu.
+SPIN = (lambda: None) if os.cpu_count() > 1 else os.sched_yield
+
+class PackedMotorControlSharedIPC(MotorControlSharedIPC):
+	# The original layout, with all of a motor's fields and the heartbeat packed together
+	motor_dt = np.dtype([
+					('name', np.dtype('U32')),
+					('mode',np.uint16),
+					('reqtorque',np.float32),
+					('acttorque',np.float32),
+					('reqspeed',np.float32),
+					('actspeed',np.float32),
+					('reqposistion',np.int64),
+					('actposistion',np.int64)])
+	shared_dt = np.dtype([
+					('heartbeat',np.float64),
+					('motors',motor_dt, (8))])
+	filename = '/dev/shm/motor_control_benchmark_packed.mmf'
+
+	def attachViews(self, data):
+		motors = data['motors'][0]
+		self._name = motors['name']
+		self._mode = motors['mode']
+		self._reqtorque = motors['reqtorque']
+		self._acttorque = motors['acttorque']
+		self._reqspeed = motors['reqspeed']
+		self._actspeed = motors['actspeed']
+		self._reqposition = motors['reqposistion']
+		self._actposition = motors['actposistion']
+
+class AlignedMotorControlSharedIPC(MotorControlSharedIPC):
+	filename = '/dev/shm/motor_control_benchmark_aligned.mmf'
+
+def motorProcess(ipcClass):
+	# Echo each new required torque back as the current torque, updating the other feedback as the real loop would
+	ipc = ipcClass()
+	ipc.open()
+	last = 0.0
+	while True:
+		ipc.checkWatchdog()
+		torque = ipc.getRequiredTorque(1)
+		if torque != last:
+			last = torque
+			ipc.setCurrentPosition(1, int(torque))
+			ipc.setCurrentSpeed(1, torque)
+			ipc.setCurrentTorque(1, torque)
+			if torque < 0:
+				break
+		else:
+			SPIN()
+
+def roundTrips(ipcClass):
+	ipc = ipcClass()
+	ipc.create()
+	ipc.setCurrentTorque(1, 0.0)
+	motor = multiprocessing.Process(target=motorProcess, args=(ipcClass,))
+	motor.start()
+	start = time.perf_counter()
+	for i in range(1, ROUND_TRIPS+1):
+		ipc.setRequiredTorque(1, float(i))
+		ipc.setRequiredSpeed(1, float(i))
+		ipc.resetWatchdog()
+		while ipc.getCurrentTorque(1) != i:
+			SPIN()
+	elapsed = time.perf_counter() - start
+	ipc.setRequiredTorque(1, -1.0)
+	motor.join()
+	os.unlink(ipc.filename)
+	return elapsed / ROUND_TRIPS
+
+if __name__ == "__main__":
+	print(f"{os.cpu_count()} cpus, {ROUND_TRIPS} round trips")
+	for name, ipcClass in (("packed", PackedMotorControlSharedIPC), ("aligned", AlignedMotorControlSharedIPC)):
+		print(f"{name:8s}: {roundTrips(ipcClass)*1e6:.2f}us per round trip")